@@ -1,9 +1,16 @@
+import bisect
+import hashlib
 import json
 import os
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
 USERS_FILE = "users.json"
-TASKS_FILE = "tasks.json"
+TASKS_FILE = "tasks.json"  # pre-sharding format, migrated on first use
+TASKS_LOG = "tasks.log"
+TASKS_DIR = "tasks"
+TASKS_INDEX = os.path.join(TASKS_DIR, "index.json")
+COMPACT_LOG_BYTES = 1024 * 1024
+PAGE_SIZE = 10
 
 
 # ------------------ FILE HANDLING ------------------
@@ -20,6 +27,196 @@ def save_data(filename, data):
         json.dump(data, f, indent=4)
 
 
+# ------------------ TASK STORAGE ------------------
+# Every user's tasks live in their own shard inside TASKS_DIR: a snapshot
+# (<shard>.json) plus an append-only journal (<shard>.log) with one JSON
+# line per change. TASKS_INDEX maps usernames to shard names, so only the
+# logged-in user's shard is ever read or written. The journal is folded
+# into the snapshot once it passes COMPACT_LOG_BYTES and on logout.
+# A journal's first line names the snapshot it continues,
+#   {"op": "base", "snapshot": "<sha1 of the snapshot file>"}
+# so if a compaction stops after replacing the snapshot but before removing
+# the journal, the old journal no longer matches and is not replayed twice.
+
+shard_cache = {}
+snapshot_ids = {}  # user -> id of the snapshot their journal continues
+
+
+def shard_name(user):
+    return hashlib.sha1(user.encode()).hexdigest()[:16]
+
+
+def shard_paths(user, create=False):
+    if user in shard_cache:
+        return shard_cache[user]
+
+    index = load_data(TASKS_INDEX)
+    if user not in index:
+        if not create:
+            return None, None
+        index[user] = shard_name(user)
+        save_data(TASKS_INDEX, index)
+
+    base = os.path.join(TASKS_DIR, index[user])
+    shard_cache[user] = (base + ".json", base + ".log")
+    return shard_cache[user]
+
+
+def apply_op(user_tasks, by_id, entry):
+    # journals written before task IDs existed address tasks by "index"
+    if entry["op"] == "add":
+        task = entry["task"]
+        user_tasks.append(task)
+        if "id" in task:
+            by_id[task["id"]] = task
+    elif entry["op"] == "complete":
+        if "id" in entry:
+            by_id[entry["id"]]["completed"] = True
+        else:
+            user_tasks[entry["index"]]["completed"] = True
+    elif entry["op"] == "delete":
+        if "id" in entry:
+            by_id.pop(entry["id"])["deleted"] = True
+        else:
+            user_tasks.pop(entry["index"])
+
+
+def assign_ids(user_tasks):
+    next_id = max((t["id"] for t in user_tasks if "id" in t), default=0) + 1
+    upgraded = False
+    for task in user_tasks:
+        if "id" not in task:
+            task["id"] = next_id
+            next_id += 1
+            upgraded = True
+    return upgraded
+
+
+def snapshot_id(data):
+    return hashlib.sha1(data).hexdigest()[:16]
+
+
+def replay_log(log_file, apply, base=None):
+    # returns False if the journal belongs to another snapshot than base
+    if not os.path.exists(log_file):
+        return True
+
+    with open(log_file, "rb+") as f:
+        offset = 0
+        for line in f:
+            try:
+                entry = json.loads(line) if line.endswith(b"\n") else None
+            except ValueError:
+                entry = None
+            if entry is None:
+                # half-written last line from a crash; cut it off so the
+                # next session's entries are not appended behind it
+                f.truncate(offset)
+                break
+            offset += len(line)
+            if entry["op"] == "base":
+                if base is not None and entry["snapshot"] != base:
+                    return False
+                continue
+            apply(entry)
+    return True
+
+
+def stamp_log(log_file, base):
+    # journals from before the "base" line existed get one, so their next
+    # compaction is as safe as any other
+    with open(log_file, "r") as f:
+        first = f.readline()
+        if first.startswith('{"op": "base"'):
+            return
+        rest = f.read()
+
+    temp_file = log_file + ".tmp"
+    with open(temp_file, "w") as f:
+        f.write(json.dumps({"op": "base", "snapshot": base}) + "\n" + first + rest)
+    os.replace(temp_file, log_file)
+
+
+def load_user_tasks(user):
+    migrate_tasks()
+    snapshot, log_file = shard_paths(user)
+    snapshot_ids[user] = snapshot_id(b"")
+    if snapshot is None:
+        return []
+
+    data = b""
+    if os.path.exists(snapshot):
+        with open(snapshot, "rb") as f:
+            data = f.read()
+    user_tasks = json.loads(data) if data else []
+    snapshot_ids[user] = snapshot_id(data)
+
+    by_id = {t["id"]: t for t in user_tasks if "id" in t and not t.get("deleted")}
+    if os.path.exists(log_file):
+        stamp_log(log_file, snapshot_ids[user])
+        if not replay_log(log_file, lambda entry: apply_op(user_tasks, by_id, entry), snapshot_ids[user]):
+            os.remove(log_file)  # already folded into the snapshot by an interrupted compaction
+
+    if assign_ids(user_tasks):
+        # persist the new IDs before any journal entry refers to them
+        compact_user_tasks(user, user_tasks)
+    return user_tasks
+
+
+def log_op(user, user_tasks, entry):
+    snapshot, log_file = shard_paths(user, create=True)
+    line = json.dumps(entry) + "\n"
+    if not os.path.exists(log_file):
+        base = snapshot_ids.get(user, snapshot_id(b""))
+        line = json.dumps({"op": "base", "snapshot": base}) + "\n" + line
+    with open(log_file, "a") as f:
+        f.write(line)
+
+    if os.path.getsize(log_file) >= COMPACT_LOG_BYTES:
+        compact_user_tasks(user, user_tasks)
+
+
+def compact_user_tasks(user, user_tasks):
+    # deleted tasks are only tombstoned in memory; drop them here
+    user_tasks[:] = [t for t in user_tasks if not t.get("deleted")]
+
+    snapshot, log_file = shard_paths(user, create=True)
+    data = json.dumps(user_tasks, indent=4).encode()
+    temp_file = snapshot + ".tmp"
+    with open(temp_file, "wb") as f:
+        f.write(data)
+    os.replace(temp_file, snapshot)
+    snapshot_ids[user] = snapshot_id(data)
+    if os.path.exists(log_file):
+        os.remove(log_file)
+
+
+def migrate_tasks():
+    # one-shot split of the old single tasks.json (+ tasks.log) into shards
+    os.makedirs(TASKS_DIR, exist_ok=True)
+    if not os.path.exists(TASKS_FILE) or os.path.exists(TASKS_INDEX):
+        return
+
+    tasks = load_data(TASKS_FILE)
+
+    def apply_legacy(entry):
+        apply_op(tasks.setdefault(entry["user"], []), {}, entry)
+
+    replay_log(TASKS_LOG, apply_legacy)
+
+    index = {}
+    for user, user_tasks in tasks.items():
+        assign_ids(user_tasks)
+        index[user] = shard_name(user)
+        save_data(os.path.join(TASKS_DIR, index[user] + ".json"), user_tasks)
+    save_data(TASKS_INDEX, index)
+
+    os.replace(TASKS_FILE, TASKS_FILE + ".migrated")
+    if os.path.exists(TASKS_LOG):
+        os.remove(TASKS_LOG)
+    print(f"📦 Migrated tasks of {len(tasks)} users to {TASKS_DIR}/.")
+
+
 # ------------------ USER SYSTEM ------------------
 
 def register_user(users):
@@ -47,9 +244,91 @@ def login_user(users):
         return None
 
 
+# ------------------ TASK INDEX ------------------
+# Lookup structures over one user's tasks, updated by add/complete/delete so
+# lookups, the filtered views and the statistics never rescan the whole list:
+#   by_id     - task id -> task, for every task that is not deleted
+#   deadlines - sorted (deadline, id) pairs of pending tasks
+#   priority  - priority -> {id: task} of pending tasks
+#   status    - completed flag -> {id: task}
+
+def deadline_key(task):
+    deadline = task["deadline"]
+    if len(deadline) != 10:  # strptime also accepts e.g. 2025-1-5
+        deadline = datetime.strptime(deadline, "%Y-%m-%d").strftime("%Y-%m-%d")
+    return deadline, task["id"]
+
+
+def priority_key(task):
+    return task["priority"].strip().capitalize()
+
+
+def build_index(user_tasks):
+    index = {
+        "by_id": {},
+        "next_id": max((t["id"] for t in user_tasks), default=0) + 1,
+        "deadlines": [],
+        "priority": {},
+        "status": {False: {}, True: {}},
+    }
+    pending = []
+    for task in user_tasks:
+        if task.get("deleted"):
+            continue
+        index["by_id"][task["id"]] = task
+        index["status"][task["completed"]][task["id"]] = task
+        if not task["completed"]:
+            pending.append(deadline_key(task))
+            index["priority"].setdefault(priority_key(task), {})[task["id"]] = task
+
+    pending.sort()
+    index["deadlines"] = pending
+    return index
+
+
+def index_add(index, task):
+    index["by_id"][task["id"]] = task
+    index["next_id"] = max(index["next_id"], task["id"] + 1)
+    index["status"][False][task["id"]] = task
+    index["priority"].setdefault(priority_key(task), {})[task["id"]] = task
+    bisect.insort(index["deadlines"], deadline_key(task))
+
+
+def index_drop_pending(index, task):
+    key = deadline_key(task)
+    i = bisect.bisect_left(index["deadlines"], key)
+    if i < len(index["deadlines"]) and index["deadlines"][i] == key:
+        del index["deadlines"][i]
+    index["priority"].get(priority_key(task), {}).pop(task["id"], None)
+
+
+def index_complete(index, task):
+    if index["status"][False].pop(task["id"], None) is not None:
+        index_drop_pending(index, task)
+    index["status"][True][task["id"]] = task
+
+
+def index_remove(index, task):
+    del index["by_id"][task["id"]]
+    if index["status"][False].pop(task["id"], None) is not None:
+        index_drop_pending(index, task)
+    index["status"][True].pop(task["id"], None)
+
+
+def due_within(index, days):
+    today = date.today()
+    start = today.isoformat()
+    stop = (today + timedelta(days=days + 1)).isoformat()
+    deadlines = index["deadlines"]
+    lo = bisect.bisect_left(deadlines, (start,))
+    hi = bisect.bisect_left(deadlines, (stop,))
+    for i in range(lo, hi):
+        yield index["status"][False][deadlines[i][1]]
+
+
 # ------------------ TASK MANAGEMENT ------------------
 
-def add_task(tasks, user):
+def add_task(tasks, user, index):
     title = input("Task title: ")
     priority = input("Priority (Low / Medium / High): ")
     deadline = input("Deadline (YYYY-MM-DD): ")
@@ -61,6 +340,7 @@ def add_task(tasks, user):
         return
 
     task = {
+        "id": index["next_id"],
         "title": title,
         "priority": priority,
         "deadline": deadline,
@@ -69,19 +349,15 @@ def add_task(tasks, user):
     }
 
     tasks[user].append(task)
-    save_data(TASKS_FILE, tasks)
+    index_add(index, task)
+    log_op(user, tasks[user], {"op": "add", "task": task})
     print("✅ Task added.")
 
 
-def view_tasks(tasks, user):
-    if not tasks[user]:
-        print("📭 No tasks found.")
-        return
-
-    for i, task in enumerate(tasks[user], start=1):
-        status = "✔ Done" if task["completed"] else "⏳ Pending"
-        print(f"""
-Task #{i}
+def print_task(task, task_id):
+    status = "✔ Done" if task["completed"] else "⏳ Pending"
+    print(f"""
+Task #{task_id}
 Title     : {task['title']}
 Priority  : {task['priority']}
 Deadline  : {task['deadline']}
@@ -89,32 +365,91 @@ Status    : {status}
 """)
 
 
-def complete_task(tasks, user):
-    view_tasks(tasks, user)
+def show_pages(tasks_by_id):
+    # tasks_by_id yields (id, task); only the pages asked for are read
+    shown = 0
+    for task_id, task in tasks_by_id:
+        if shown and shown % PAGE_SIZE == 0:
+            more = input(f"-- {shown} shown. Enter for more, q to stop: ")
+            if more.strip().lower() == "q":
+                return shown
+        print_task(task, task_id)
+        shown += 1
+    return shown
+
+
+def list_tasks(index):
+    if not index["by_id"]:
+        print("📭 No tasks found.")
+        return
+
+    show_pages(index["by_id"].items())
+
+
+def view_tasks(index):
+    print("""
+1. All tasks
+2. Pending
+3. Completed
+4. Due in the next N days
+5. High priority pending
+""")
+    choice = input("Show: ")
+
+    if choice == "1":
+        list_tasks(index)
+        return
+    elif choice == "2":
+        selected = index["status"][False].values()
+    elif choice == "3":
+        selected = index["status"][True].values()
+    elif choice == "4":
+        try:
+            days = int(input("Days ahead: "))
+        except ValueError:
+            print("❌ Invalid number.")
+            return
+        selected = due_within(index, days)
+    elif choice == "5":
+        selected = index["priority"].get("High", {}).values()
+    else:
+        print("❌ Invalid option.")
+        return
+
+    if not show_pages((task["id"], task) for task in selected):
+        print("📭 No tasks found.")
+
+
+def complete_task(tasks, user, index):
+    list_tasks(index)
     try:
-        index = int(input("Enter task number to mark complete: ")) - 1
-        tasks[user][index]["completed"] = True
-        save_data(TASKS_FILE, tasks)
+        task_id = int(input("Enter task ID to mark complete: "))
+        task = index["by_id"][task_id]
+        task["completed"] = True
+        index_complete(index, task)
+        log_op(user, tasks[user], {"op": "complete", "id": task_id})
         print("✅ Task marked as completed.")
     except:
         print("❌ Invalid selection.")
 
 
-def delete_task(tasks, user):
-    view_tasks(tasks, user)
+def delete_task(tasks, user, index):
+    list_tasks(index)
     try:
-        index = int(input("Enter task number to delete: ")) - 1
-        removed = tasks[user].pop(index)
-        save_data(TASKS_FILE, tasks)
+        task_id = int(input("Enter task ID to delete: "))
+        removed = index["by_id"][task_id]
+        removed["deleted"] = True
+        index_remove(index, removed)
+        log_op(user, tasks[user], {"op": "delete", "id": task_id})
         print(f"🗑 Deleted task: {removed['title']}")
     except:
         print("❌ Invalid selection.")
 
 
-def task_stats(tasks, user):
-    total = len(tasks[user])
-    completed = sum(1 for t in tasks[user] if t["completed"])
-    pending = total - completed
+def task_stats(index):
+    completed = len(index["status"][True])
+    pending = len(index["status"][False])
+    total = completed + pending
 
     print("\n📊 Task Statistics")
     print(f"Total     : {total}")
@@ -125,9 +460,8 @@ def task_stats(tasks, user):
 # ------------------ MENUS ------------------
 
 def task_menu(user):
-    tasks = load_data(TASKS_FILE)
-    if user not in tasks:
-        tasks[user] = []
+    tasks = {user: load_user_tasks(user)}
+    index = build_index(tasks[user])
 
     while True:
         print("""
@@ -143,16 +477,17 @@ def task_menu(user):
         choice = input("Choose: ")
 
         if choice == "1":
-            add_task(tasks, user)
+            add_task(tasks, user, index)
         elif choice == "2":
-            view_tasks(tasks, user)
+            view_tasks(index)
         elif choice == "3":
-            complete_task(tasks, user)
+            complete_task(tasks, user, index)
         elif choice == "4":
-            delete_task(tasks, user)
+            delete_task(tasks, user, index)
         elif choice == "5":
-            task_stats(tasks, user)
+            task_stats(index)
         elif choice == "6":
+            compact_user_tasks(user, tasks[user])
             print("👋 Logged out.")
             break
         else:
@@ -0,0 +1,185 @@
+try:
+    import numpy as np
+except ImportError:  # the columnar backend is optional
+    np = None
+
+TYPES = ["income", "expense"]
+TYPE_CODES = {name: code for code, name in enumerate(TYPES)}
+ITER_CHUNK = 10000
+
+
+# Transactions kept column by column in NumPy arrays: amounts as int64
+# cents, types and categories as small integer codes, dates as datetime64.
+# Millions of rows take a fraction of the memory of a list of dicts and the
+# analytics run vectorized. The store still behaves like a list of
+# transaction dicts (len, index, iterate, append), so FinanceManager can use
+# it in place of one.
+class ColumnarStore:
+    def __init__(self, capacity=1024):
+        if np is None:
+            raise RuntimeError("The columnar backend needs numpy (pip install numpy).")
+
+        self.size = 0
+        self.cents = np.zeros(capacity, dtype=np.int64)
+        self.types = np.zeros(capacity, dtype=np.int8)
+        self.categories = np.zeros(capacity, dtype=np.int32)
+        self.dates = np.zeros(capacity, dtype="datetime64[s]")
+        self.descriptions = []
+        self.category_names = []
+        self.category_codes = {}
+
+    # ----------------- LIST OF DICTS INTERFACE -----------------
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, i):
+        if i < 0:
+            i += self.size
+        if not 0 <= i < self.size:
+            raise IndexError("transaction index out of range")
+
+        return {
+            "amount": int(self.cents[i]) / 100,
+            "category": self.category_names[self.categories[i]],
+            "description": self.descriptions[i],
+            "type": TYPES[self.types[i]],
+            "date": str(self.dates[i]).replace("T", " ")
+        }
+
+    def __iter__(self):
+        # converts the columns a chunk at a time instead of one scalar at a time
+        for start in range(0, self.size, ITER_CHUNK):
+            end = min(start + ITER_CHUNK, self.size)
+            amounts = (self.cents[start:end] / 100).tolist()
+            categories = self.categories[start:end].tolist()
+            types = self.types[start:end].tolist()
+            dates = np.datetime_as_string(self.dates[start:end]).tolist()
+            for i in range(end - start):
+                yield {
+                    "amount": amounts[i],
+                    "category": self.category_names[categories[i]],
+                    "description": self.descriptions[start + i],
+                    "type": TYPES[types[i]],
+                    "date": dates[i].replace("T", " ")
+                }
+
+    def append(self, t):
+        self.extend([t])
+
+    def extend(self, rows):
+        rows = list(rows)
+        start = self.size
+        end = start + len(rows)
+        self.reserve(end)
+
+        self.cents[start:end] = [round(t["amount"] * 100) for t in rows]
+        self.types[start:end] = [TYPE_CODES[t["type"]] for t in rows]
+        self.categories[start:end] = [self.category_code(t["category"]) for t in rows]
+        self.dates[start:end] = np.array([t["date"].replace(" ", "T") for t in rows], dtype="datetime64[s]")
+        self.descriptions.extend(t["description"] for t in rows)
+        self.size = end
+
+    def clear(self):
+        self.size = 0
+        self.descriptions = []
+        self.category_names = []
+        self.category_codes = {}
+
+    def reserve(self, needed):
+        capacity = len(self.cents)
+        if needed <= capacity:
+            return
+
+        while capacity < needed:
+            capacity *= 2
+        for name in ("cents", "types", "categories", "dates"):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def category_code(self, name):
+        if name not in self.category_codes:
+            self.category_codes[name] = len(self.category_names)
+            self.category_names.append(name)
+        return self.category_codes[name]
+
+    def totals(self):
+        # (balance, {"YYYY-MM": [income, expense]}, {"YYYY-MM": {category: [income, expense]}})
+        # in the shape FinanceManager keeps them, summed with one bincount
+        if self.size == 0:
+            return 0, {}, {}
+
+        months = self.dates[:self.size].astype("datetime64[M]")
+        first = months.min()
+        month_offsets = (months - first).astype(np.int64)
+        groups = (month_offsets * len(self.category_names) + self.categories[:self.size]) * 2 + self.types[:self.size]
+        keys, inverse = np.unique(groups, return_inverse=True)
+        sums = np.bincount(inverse.ravel(), weights=self.cents[:self.size]) / 100
+
+        balance = 0
+        monthly = {}
+        monthly_by_category = {}
+        for key, amount in zip(keys.tolist(), sums.tolist()):
+            column = key % 2
+            month = str(first + key // 2 // len(self.category_names))
+            category = self.category_names[key // 2 % len(self.category_names)]
+            balance += amount if column == 0 else -amount
+            monthly.setdefault(month, [0, 0])[column] += amount
+            monthly_by_category.setdefault(month, {}).setdefault(category, [0, 0])[column] += amount
+        return balance, monthly, monthly_by_category
+
+    # ----------------- ANALYTICS -----------------
+
+    def select(self, start=None, end=None, t_type=None):
+        # start and end are inclusive "YYYY-MM-DD" dates
+        mask = np.ones(self.size, dtype=bool)
+        dates = self.dates[:self.size]
+        if start:
+            mask &= dates >= np.datetime64(start, "s")
+        if end:
+            mask &= dates < np.datetime64(end, "D") + np.timedelta64(1, "D")
+        if t_type:
+            mask &= self.types[:self.size] == TYPE_CODES[t_type]
+        return mask
+
+    def summary(self, start=None, end=None):
+        mask = self.select(start, end)
+        cents = self.cents[:self.size][mask]
+        is_income = self.types[:self.size][mask] == TYPE_CODES["income"]
+        income = int(cents[is_income].sum())
+        expense = int(cents[~is_income].sum())
+        return income / 100, expense / 100
+
+    def balance(self, start=None, end=None):
+        income, expense = self.summary(start, end)
+        return income - expense
+
+    def top_categories(self, n=5, start=None, end=None, t_type="expense"):
+        mask = self.select(start, end, t_type)
+        totals = np.bincount(
+            self.categories[:self.size][mask],
+            weights=self.cents[:self.size][mask],
+            minlength=len(self.category_names)
+        )
+        top = np.argsort(totals)[::-1][:n]
+        return [(self.category_names[code], float(totals[code]) / 100) for code in top if totals[code]]
+
+    def rolling_monthly_spend(self, window=3):
+        if window < 1:
+            raise ValueError("the window must be at least 1 month")
+        mask = self.select(t_type="expense")
+        if not mask.any():
+            return []
+
+        months = self.dates[:self.size][mask].astype("datetime64[M]")
+        first = months.min()
+        offsets = (months - first).astype(np.int64)
+        spend = np.bincount(offsets, weights=self.cents[:self.size][mask])
+
+        window = min(window, len(spend))
+        running = np.cumsum(np.concatenate(([0], spend)))
+        rolling = (running[window:] - running[:-window]) / window / 100
+        labels = first + np.arange(window - 1, len(spend))
+        return [(str(month), float(amount)) for month, amount in zip(labels, rolling)]
@@ -0,0 +1,87 @@
+import csv
+import json
+import math
+import time
+from datetime import datetime
+from itertools import islice
+
+BATCH_SIZE = 10000
+MAX_AMOUNT = 10 ** 12  # so cents and their sums stay well inside the columnar store's int64
+
+
+# Bank statements are streamed row by row and parsed in batches, so only
+# one batch of raw rows is in memory at a time. Each parsed batch is added
+# to the manager and appended to finance_data.json in one write, so the
+# file is never built up or rewritten as a whole.
+
+def read_rows(path):
+    with open(path, "r", newline="", encoding="utf-8-sig") as f:  # bank exports often start with a BOM
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        yield None  # counted as rejected by parse_batch
+        else:
+            yield from csv.DictReader(f)
+
+
+def batches(rows, size):
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def parse_row(row):
+    amount = float(row["amount"])
+    if not math.isfinite(amount) or abs(amount) > MAX_AMOUNT:
+        raise ValueError(f"amount {row['amount']!r} out of range")
+    t_type = (row.get("type") or "").strip().lower()
+    if not t_type:
+        # signed exports: money in is positive, money out negative
+        t_type = "income" if amount >= 0 else "expense"
+    if t_type not in ("income", "expense"):
+        raise ValueError(f"unknown type {t_type!r}")
+
+    date = datetime.fromisoformat(str(row["date"]).strip())
+
+    return {
+        "amount": abs(amount),
+        "category": (row.get("category") or "uncategorized").strip(),
+        "description": (row.get("description") or "").strip(),
+        "type": t_type,
+        "date": date.strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+def parse_batch(batch):
+    parsed = []
+    rejected = 0
+    for row in batch:
+        try:
+            parsed.append(parse_row(row))
+        except (KeyError, TypeError, ValueError):
+            rejected += 1
+    return parsed, rejected
+
+
+def import_file(manager, path, batch_size=BATCH_SIZE):
+    imported = 0
+    rejected = 0
+    start = time.perf_counter()
+
+    for batch in batches(read_rows(path), batch_size):
+        parsed, bad = parse_batch(batch)
+        manager.add_transactions(parsed)
+        imported += len(parsed)
+        rejected += bad
+
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        print(f"\r{imported} rows imported ({imported / elapsed:.0f} rows/s)", end="", flush=True)
+
+    elapsed = time.perf_counter() - start
+    print()
+    return imported, rejected, elapsed
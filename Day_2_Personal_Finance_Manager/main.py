@@ -1,8 +1,62 @@
 import json
 import os
 from datetime import datetime
+from itertools import islice
+
+import columnar
+from columnar import ColumnarStore
+from importer import import_file
 
 DATA_FILE = "finance_data.json"
+BACKEND = "columnar" if columnar.np is not None else "list"
+LOAD_BATCH = 10000
+
+
+# finance_data.json is a JSON list written one transaction per line:
+#   [
+#   {"amount": 12.5, "category": "food", ...},
+#   {"amount": 900.0, "category": "salary", ...}
+#   ]
+# so it can be read and written row by row, and a new transaction is added
+# by overwriting the closing "]" instead of rewriting the whole file. Files
+# saved in the old indented layout are still read and are rewritten in this
+# layout on the next save.
+
+def read_transactions(path):
+    with open(path, "r") as f:
+        start = f.read(6)
+        f.seek(0)
+        if not start.startswith("[\n") or start.startswith("[\n    "):
+            yield from json.load(f)  # old indented layout
+            return
+
+        f.readline()
+        while True:
+            lines = [line.strip().rstrip(",") for line in islice(f, LOAD_BATCH)]
+            finished = not lines or "]" in lines
+            if "]" in lines:
+                lines = lines[:lines.index("]")]
+            try:
+                yield from json.loads("[" + ",".join(lines) + "]")  # a batch of lines in one call
+            except ValueError:
+                for line in lines:
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        return  # half-written last line from a crash, dropped on the next rewrite
+            if finished:
+                return
+
+
+def appendable(path):
+    # True when the file is in the one-per-line layout and ends with its "]"
+    with open(path, "rb") as f:
+        head = f.read(3)
+        f.seek(0, os.SEEK_END)
+        if f.tell() < 4:
+            return False
+        f.seek(-3, os.SEEK_END)
+        return head[:2] == b"[\n" and head != b"[\n " and f.read() == b"\n]\n"
 
 
 class Transaction:
@@ -24,54 +78,132 @@ class Transaction:
 
 
 class FinanceManager:
-    def __init__(self):
+    def __init__(self, backend="list"):
+        # "columnar" keeps transactions in a NumPy-backed ColumnarStore
+        self.store = ColumnarStore() if backend == "columnar" else None
         self.transactions = []
+        # running totals, kept up to date by add_income / add_expense
+        self.balance = 0
+        self.monthly = {}  # "YYYY-MM" -> [income, expense]
+        self.monthly_by_category = {}  # "YYYY-MM" -> {category: [income, expense]}
+        self.appendable = False  # can new rows be added to the end of DATA_FILE
         self.load_data()
 
     def load_data(self):
-        if os.path.exists(DATA_FILE):
-            with open(DATA_FILE, "r") as f:
-                data = json.load(f)
-                self.transactions = data
+        rows = read_transactions(DATA_FILE) if os.path.exists(DATA_FILE) else iter([])
+        self.appendable = os.path.exists(DATA_FILE) and appendable(DATA_FILE)
+
+        self.balance = 0
+        self.monthly = {}
+        self.monthly_by_category = {}
+        if self.store is not None:
+            # rows go into the columns a batch at a time and the totals are summed vectorized
+            self.store.clear()
+            while True:
+                batch = list(islice(rows, LOAD_BATCH))
+                if not batch:
+                    break
+                self.store.extend(batch)
+            self.transactions = self.store
+            self.balance, self.monthly, self.monthly_by_category = self.store.totals()
+            return
+
+        self.transactions = list(rows)
+        for t in self.transactions:
+            self.update_totals(t)
+
+    def update_totals(self, t):
+        month = t["date"][:7]
+        column = 0 if t["type"] == "income" else 1
+
+        if column == 0:
+            self.balance += t["amount"]
         else:
-            self.transactions = []
+            self.balance -= t["amount"]
+
+        self.monthly.setdefault(month, [0, 0])[column] += t["amount"]
+        categories = self.monthly_by_category.setdefault(month, {})
+        categories.setdefault(t["category"], [0, 0])[column] += t["amount"]
 
     def save_data(self):
-        with open(DATA_FILE, "w") as f:
-            json.dump(self.transactions, f, indent=4)
+        # whole file, streamed row by row into a temp file that then replaces it
+        temp_path = DATA_FILE + ".tmp"
+        with open(temp_path, "w") as f:
+            f.write("[\n")
+            for i, t in enumerate(self.transactions):
+                f.write((",\n" if i else "") + json.dumps(t))
+            f.write("\n]\n" if self.transactions else "]\n")
+        os.replace(temp_path, DATA_FILE)
+        self.appendable = True
+
+    def append_rows(self, rows):
+        # saves rows already added to self.transactions by writing them over the closing "]"
+        if not rows:
+            return
+        if not self.appendable:
+            self.save_data()
+            return
+
+        with open(DATA_FILE, "r+b") as f:
+            f.seek(-3, os.SEEK_END)
+            separator = "\n" if f.tell() == 1 else ",\n"  # nothing but "[" before it
+            f.write((separator + ",\n".join(json.dumps(t) for t in rows) + "\n]\n").encode())
 
     def add_income(self, amount, category, description):
-        t = Transaction(amount, category, description, "income")
-        self.transactions.append(t.to_dict())
-        self.save_data()
+        t = Transaction(amount, category, description, "income").to_dict()
+        self.transactions.append(t)
+        self.update_totals(t)
+        self.append_rows([t])
 
     def add_expense(self, amount, category, description):
-        t = Transaction(amount, category, description, "expense")
-        self.transactions.append(t.to_dict())
-        self.save_data()
+        t = Transaction(amount, category, description, "expense").to_dict()
+        self.transactions.append(t)
+        self.update_totals(t)
+        self.append_rows([t])
+
+    def add_transactions(self, rows):
+        # bulk path for imports: one append to the data file per batch
+        self.transactions.extend(rows)
+        for t in rows:
+            self.update_totals(t)
+        self.append_rows(rows)
 
     def get_balance(self):
-        balance = 0
-        for t in self.transactions:
-            if t["type"] == "income":
-                balance += t["amount"]
-            else:
-                balance -= t["amount"]
-        return balance
+        return self.balance
 
     def monthly_summary(self, month):
+        if month in self.monthly:
+            income, expense = self.monthly[month]
+            return income, expense
+
+        # partial prefixes like "2024" still work, summed over the months
         income = 0
         expense = 0
-
-        for t in self.transactions:
-            if t["date"].startswith(month):
-                if t["type"] == "income":
-                    income += t["amount"]
-                else:
-                    expense += t["amount"]
+        for key, (month_income, month_expense) in self.monthly.items():
+            if key.startswith(month):
+                income += month_income
+                expense += month_expense
 
         return income, expense
 
+    def category_summary(self, month):
+        categories = self.monthly_by_category.get(month, {})
+        return {category: tuple(totals) for category, totals in categories.items()}
+
+    def range_summary(self, start, end):
+        return self.columnar().summary(start, end)
+
+    def top_categories(self, n, start=None, end=None):
+        return self.columnar().top_categories(n, start, end)
+
+    def rolling_monthly_spend(self, window):
+        return self.columnar().rolling_monthly_spend(window)
+
+    def columnar(self):
+        if self.store is None:
+            raise RuntimeError("Analytics need the columnar backend (pip install numpy).")
+        return self.store
+
     def show_all_transactions(self):
         if not self.transactions:
             print("No transactions yet.")
@@ -87,12 +219,51 @@ def menu():
     print("2. Add Expense")
     print("3. View Balance")
     print("4. Monthly Summary")
-    print("5. Show All Transactions")
-    print("6. Exit")
+    print("5. Category Summary")
+    print("6. Analytics")
+    print("7. Import Bank Statement (CSV/JSONL)")
+    print("8. Show All Transactions")
+    print("9. Exit")
+
+
+def analytics(manager):
+    if manager.store is None:
+        print("Analytics need numpy. Install it with: pip install numpy")
+        return
+
+    print("1. Summary for a date range")
+    print("2. Top spending categories")
+    print("3. Rolling monthly spend")
+    choice = input("Choose an option: ")
+
+    try:
+        if choice == "1":
+            start = input("From (YYYY-MM-DD): ")
+            end = input("To (YYYY-MM-DD): ")
+            income, expense = manager.range_summary(start, end)
+            print(f"Income: {income}")
+            print(f"Expense: {expense}")
+            print(f"Net: {income - expense}")
+
+        elif choice == "2":
+            n = int(input("How many categories? "))
+            for category, amount in manager.top_categories(n):
+                print(f"{category}: {amount}")
+
+        elif choice == "3":
+            window = int(input("Window in months: "))
+            for month, amount in manager.rolling_monthly_spend(window):
+                print(f"{month}: {amount:.2f}")
+
+        else:
+            print("Invalid option.")
+    except ValueError as e:
+        # bad dates or numbers only cancel this report, not the program
+        print(f"Invalid input: {e}")
 
 
 def main():
-    manager = FinanceManager()
+    manager = FinanceManager(BACKEND)
 
     while True:
         menu()
@@ -124,9 +295,29 @@ def main():
             print(f"Net: {income - expense}")
 
         elif choice == "5":
-            manager.show_all_transactions()
+            month = input("Enter month (YYYY-MM): ")
+            summary = manager.category_summary(month)
+            if not summary:
+                print("No transactions in that month.")
+            for category, (income, expense) in sorted(summary.items()):
+                print(f"{category}: income {income}, expense {expense}")
 
         elif choice == "6":
+            analytics(manager)
+
+        elif choice == "7":
+            path = input("Statement file: ")
+            if not os.path.exists(path):
+                print("File not found.")
+                continue
+            imported, rejected, elapsed = import_file(manager, path)
+            print(f"Imported {imported} transactions in {elapsed:.2f}s "
+                  f"({imported / max(elapsed, 1e-9):.0f} rows/s), skipped {rejected} invalid rows.")
+
+        elif choice == "8":
+            manager.show_all_transactions()
+
+        elif choice == "9":
             print("Goodbye!")
             break
 
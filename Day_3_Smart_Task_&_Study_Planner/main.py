@@ -1,24 +1,38 @@
+import bisect
 import json
 import os
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
+
+from scheduler import DEFAULT_EFFORT, StudyScheduler
 
 DATA_FILE = "tasks_data.json"
 
 
+def parse_deadline(deadline):
+    try:
+        return datetime.strptime(deadline, "%Y-%m-%d")
+    except ValueError:
+        return None
+
+
 class Task:
-    def __init__(self, title, priority, deadline):
+    def __init__(self, task_id, title, priority, deadline, effort=DEFAULT_EFFORT):
+        self.id = task_id
         self.title = title
         self.priority = priority  # Low / Medium / High
         self.deadline = deadline
+        self.effort = effort  # estimated minutes of work
         self.completed = False
         self.created_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         self.completed_at = None
 
     def to_dict(self):
         return {
+            "id": self.id,
             "title": self.title,
             "priority": self.priority,
             "deadline": self.deadline,
+            "effort": self.effort,
             "completed": self.completed,
             "created_at": self.created_at,
             "completed_at": self.completed_at
@@ -39,10 +53,68 @@ class StudySession:
         }
 
 
+class StudyStats:
+    # Rolling study-time totals, fed one session at a time by
+    # TaskPlanner.add_study_session, so nothing ever rescans the sessions.
+    def __init__(self):
+        self.total = 0
+        self.per_task = {}  # task title -> minutes
+        self.per_day = {}  # date -> minutes
+        self.per_week = {}  # (ISO year, ISO week) -> minutes
+        self.last_day = None
+        self.current_streak = 0
+        self.longest_streak = 0
+
+    def add(self, session):
+        minutes = session["minutes"]
+        day = date.fromisoformat(session["date"][:10])
+        week = day.isocalendar()[:2]
+
+        self.total += minutes
+        self.per_task[session["task_title"]] = self.per_task.get(session["task_title"], 0) + minutes
+        self.per_day[day] = self.per_day.get(day, 0) + minutes
+        self.per_week[week] = self.per_week.get(week, 0) + minutes
+
+        # sessions arrive in time order, so only a new latest day moves the streak
+        if self.last_day is None or day > self.last_day:
+            if self.last_day is not None and day - self.last_day == timedelta(days=1):
+                self.current_streak += 1
+            else:
+                self.current_streak = 1
+            self.last_day = day
+            self.longest_streak = max(self.longest_streak, self.current_streak)
+
+    def streak(self, today=None):
+        today = today or date.today()
+        if self.last_day is None or today - self.last_day > timedelta(days=1):
+            return 0
+        return self.current_streak
+
+    def series(self, start, end, bucket="day"):
+        # one lookup per bucket in [start, end], whatever the number of sessions
+        if bucket == "week":
+            day = start - timedelta(days=start.weekday())
+            step, totals, key = timedelta(weeks=1), self.per_week, lambda d: d.isocalendar()[:2]
+        else:
+            day = start
+            step, totals, key = timedelta(days=1), self.per_day, lambda d: d
+
+        series = []
+        while day <= end:
+            series.append((day, totals.get(key(day), 0)))
+            day += step
+        return series
+
+
 class TaskPlanner:
     def __init__(self):
         self.tasks = []
+        self.task_index = {}  # task id -> task dict
+        self.next_id = 1
+        self.pending_deadlines = []  # sorted (deadline, task id) of pending tasks
         self.study_sessions = []
+        self.stats = StudyStats()
+        self.scheduler = None  # built on first use by study_plan
         self.load_data()
 
     def load_data(self):
@@ -55,6 +127,26 @@ class TaskPlanner:
             self.tasks = []
             self.study_sessions = []
 
+        # files written before task IDs existed get them assigned here
+        self.next_id = max((t["id"] for t in self.tasks if "id" in t), default=0) + 1
+        for task in self.tasks:
+            if "id" not in task:
+                task["id"] = self.next_id
+                self.next_id += 1
+        self.task_index = {task["id"]: task for task in self.tasks}
+
+        self.pending_deadlines = []
+        for task in self.tasks:
+            deadline = parse_deadline(task["deadline"])
+            if not task["completed"] and deadline is not None:
+                self.pending_deadlines.append((deadline, task["id"]))
+        self.pending_deadlines.sort()
+
+        self.stats = StudyStats()
+        for session in self.study_sessions:
+            self.stats.add(session)
+        self.scheduler = None
+
     def save_data(self):
         with open(DATA_FILE, "w") as f:
             json.dump({
@@ -62,48 +154,97 @@ class TaskPlanner:
                 "sessions": self.study_sessions
             }, f, indent=4)
 
-    def add_task(self, title, priority, deadline):
-        task = Task(title, priority, deadline)
-        self.tasks.append(task.to_dict())
+    def add_task(self, title, priority, deadline, effort=DEFAULT_EFFORT):
+        task = Task(self.next_id, title, priority, deadline, effort).to_dict()
+        self.next_id += 1
+        self.tasks.append(task)
+        self.task_index[task["id"]] = task
+
+        deadline = parse_deadline(deadline)
+        if deadline is not None:
+            bisect.insort(self.pending_deadlines, (deadline, task["id"]))
+        if self.scheduler is not None:
+            self.scheduler.add_task(task)
         self.save_data()
 
-    def complete_task(self, index):
-        try:
-            self.tasks[index]["completed"] = True
-            self.tasks[index]["completed_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            self.save_data()
-        except IndexError:
-            print("Invalid task number.")
+    def complete_task(self, task_id):
+        task = self.task_index.get(task_id)
+        if task is None:
+            print("Invalid task ID.")
+            return False
+
+        deadline = parse_deadline(task["deadline"])
+        if not task["completed"] and deadline is not None:
+            i = bisect.bisect_left(self.pending_deadlines, (deadline, task_id))
+            if i < len(self.pending_deadlines) and self.pending_deadlines[i] == (deadline, task_id):
+                del self.pending_deadlines[i]
+
+        if self.scheduler is not None:
+            self.scheduler.remove_task(task_id)
+
+        task["completed"] = True
+        task["completed_at"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.save_data()
+        return True
 
     def add_study_session(self, task_title, minutes):
-        session = StudySession(task_title, minutes)
-        self.study_sessions.append(session.to_dict())
+        session = StudySession(task_title, minutes).to_dict()
+        self.study_sessions.append(session)
+        self.stats.add(session)
+        if self.scheduler is not None:
+            self.scheduler.log_minutes(task_title, minutes)
         self.save_data()
 
     def overdue_tasks(self):
-        now = datetime.now()
-        overdue = []
+        return self.tasks_due_between(None, datetime.now())
 
-        for task in self.tasks:
-            if not task["completed"]:
-                deadline = datetime.strptime(task["deadline"], "%Y-%m-%d")
-                if deadline < now:
-                    overdue.append(task)
+    def due_within(self, days):
+        now = datetime.now()
+        return self.tasks_due_between(now, now + timedelta(days=days))
 
-        return overdue
+    def tasks_due_between(self, start, end):
+        # only the matching slice of pending_deadlines is read
+        lo = 0 if start is None else bisect.bisect_left(self.pending_deadlines, (start,))
+        hi = bisect.bisect_left(self.pending_deadlines, (end,))
+        return [self.task_index[task_id] for _, task_id in self.pending_deadlines[lo:hi]]
 
     def show_tasks(self):
         if not self.tasks:
             print("No tasks available.")
             return
 
-        for i, task in enumerate(self.tasks, 1):
+        for task in self.tasks:
             status = "✓" if task["completed"] else "✗"
-            print(f"{i}. [{status}] {task['title']} | Priority: {task['priority']} | Deadline: {task['deadline']}")
+            print(f"{task['id']}. [{status}] {task['title']} | Priority: {task['priority']} | Deadline: {task['deadline']}")
 
     def study_statistics(self):
-        total_minutes = sum(s["minutes"] for s in self.study_sessions)
-        return total_minutes
+        return self.stats.total
+
+    def recent_daily_minutes(self, days=14):
+        # average minutes on the days you actually studied, over the last `days`
+        today = date.today()
+        studied = [self.stats.per_day.get(today - timedelta(days=d), 0) for d in range(days)]
+        active = [minutes for minutes in studied if minutes]
+        return sum(active) // len(active) if active else 0
+
+    def study_plan(self, available_minutes, days=7):
+        # plan with what you can realistically do: the lower of the minutes
+        # you have and the minutes you have been studying recently
+        if available_minutes <= 0:
+            raise ValueError("minutes per day must be more than 0")
+        daily = available_minutes
+        recent = self.recent_daily_minutes()
+        if recent:
+            daily = min(daily, recent)
+
+        if self.scheduler is None:
+            self.scheduler = StudyScheduler(daily)
+            for task in self.tasks:
+                if not task["completed"]:
+                    self.scheduler.add_task(task, self.stats.per_task.get(task["title"], 0))
+        self.scheduler.daily_minutes = daily
+
+        return daily, self.scheduler.plan(days)
 
 
 def menu():
@@ -113,8 +254,10 @@ def menu():
     print("3. Show Tasks")
     print("4. Add Study Session")
     print("5. Overdue Tasks")
-    print("6. Study Statistics")
-    print("7. Exit")
+    print("6. Tasks Due Soon")
+    print("7. Study Statistics")
+    print("8. Study Plan")
+    print("9. Exit")
 
 
 def main():
@@ -128,14 +271,15 @@ def main():
             title = input("Task title: ")
             priority = input("Priority (Low/Medium/High): ")
             deadline = input("Deadline (YYYY-MM-DD): ")
-            planner.add_task(title, priority, deadline)
+            effort = input(f"Estimated effort in minutes [{DEFAULT_EFFORT}]: ")
+            planner.add_task(title, priority, deadline, int(effort) if effort else DEFAULT_EFFORT)
             print("Task added.")
 
         elif choice == "2":
             planner.show_tasks()
-            index = int(input("Task number to complete: ")) - 1
-            planner.complete_task(index)
-            print("Task marked as completed.")
+            task_id = int(input("Task ID to complete: "))
+            if planner.complete_task(task_id):
+                print("Task marked as completed.")
 
         elif choice == "3":
             planner.show_tasks()
@@ -156,10 +300,52 @@ def main():
                     print(f"- {task['title']} (Deadline: {task['deadline']})")
 
         elif choice == "6":
-            total = planner.study_statistics()
-            print(f"Total study time: {total} minutes")
+            days = int(input("Within how many days? "))
+            due = planner.due_within(days)
+            if not due:
+                print("Nothing due in that time.")
+            else:
+                print("Due soon:")
+                for task in due:
+                    print(f"- {task['title']} (Deadline: {task['deadline']})")
 
         elif choice == "7":
+            stats = planner.stats
+            today = date.today()
+            print(f"Total study time: {planner.study_statistics()} minutes")
+            print(f"Today: {stats.per_day.get(today, 0)} minutes")
+            print(f"This week: {stats.per_week.get(today.isocalendar()[:2], 0)} minutes")
+            print(f"Streak: {stats.streak(today)} days (longest {stats.longest_streak})")
+
+            print("Last 7 days:")
+            for day, minutes in stats.series(today - timedelta(days=6), today):
+                print(f"  {day}: {minutes} minutes")
+
+            top = sorted(stats.per_task.items(), key=lambda item: item[1], reverse=True)[:5]
+            if top:
+                print("Most studied tasks:")
+                for title, minutes in top:
+                    print(f"  {title}: {minutes} minutes")
+
+        elif choice == "8":
+            available = int(input("Minutes available per day: "))
+            if available <= 0:
+                print("Minutes per day must be more than 0.")
+                continue
+            daily, (schedule, late) = planner.study_plan(available)
+            print(f"Planning {daily} minutes per day:")
+            for day, slots in schedule:
+                print(f"{day}:")
+                if not slots:
+                    print("  free")
+                for task_id, minutes in slots:
+                    print(f"  {planner.task_index[task_id]['title']} - {minutes} min")
+
+            for task_id, finish in late:
+                task = planner.task_index[task_id]
+                print(f"⚠ {task['title']} would be finished on {finish}, after its deadline {task['deadline']}")
+
+        elif choice == "9":
             print("Goodbye!")
             break
 
@@ -0,0 +1,108 @@
+import bisect
+from datetime import date, datetime, timedelta
+
+DEFAULT_EFFORT = 60  # minutes, for tasks saved without an estimate
+PRIORITY_SLACK = {"high": 2, "medium": 1, "low": 0}  # days a task is pulled forward
+
+
+# Earliest-deadline-first, with higher priorities treated as if their
+# deadline were a few days earlier. Because a task's key never changes, the
+# greedy "take the most urgent task until it is done" schedule is simply the
+# tasks in key order laid end to end over the days. The order is kept sorted
+# with bisect and starts[i] holds the minutes scheduled before order[i], so
+# completing a task or logging study time only recomputes the offsets after
+# that task instead of rebuilding the whole plan.
+class StudyScheduler:
+    def __init__(self, daily_minutes):
+        self.daily_minutes = daily_minutes
+        self.order = []  # sorted (key, task id)
+        self.keys = {}  # task id -> key
+        self.remaining = {}  # task id -> minutes of work left
+        self.deadlines = {}  # task id -> deadline date or None
+        self.by_title = {}  # task title -> task id, for study sessions
+        self.starts = []
+        self.dirty_from = 0
+
+    def add_task(self, task, studied=0):
+        try:
+            deadline = datetime.strptime(task["deadline"], "%Y-%m-%d").date()
+            ordinal = deadline.toordinal()
+        except ValueError:
+            deadline = None
+            ordinal = date.max.toordinal()
+        slack = PRIORITY_SLACK.get(task["priority"].strip().lower(), 0)
+
+        task_id = task["id"]
+        key = ordinal - slack
+        self.keys[task_id] = key
+        self.remaining[task_id] = max(task.get("effort", DEFAULT_EFFORT) - studied, 0)
+        self.deadlines[task_id] = deadline
+        self.by_title[task["title"]] = task_id
+
+        i = bisect.bisect_left(self.order, (key, task_id))
+        self.order.insert(i, (key, task_id))
+        self.starts.insert(i, 0)
+        self.dirty_from = min(self.dirty_from, i)
+
+    def remove_task(self, task_id):
+        i = self.position(task_id)
+        if i is None:
+            return
+
+        del self.order[i]
+        del self.starts[i]
+        del self.keys[task_id]
+        del self.remaining[task_id]
+        del self.deadlines[task_id]
+        self.dirty_from = min(self.dirty_from, i)
+
+    def log_minutes(self, title, minutes):
+        task_id = self.by_title.get(title)
+        i = None if task_id is None else self.position(task_id)
+        if i is None:
+            return
+
+        self.remaining[task_id] = max(self.remaining[task_id] - minutes, 0)
+        self.dirty_from = min(self.dirty_from, i + 1)
+
+    def position(self, task_id):
+        if task_id not in self.keys:
+            return None
+        return bisect.bisect_left(self.order, (self.keys[task_id], task_id))
+
+    def refresh(self):
+        if self.order:
+            self.starts[0] = 0
+        for i in range(max(self.dirty_from, 1), len(self.order)):
+            self.starts[i] = self.starts[i - 1] + self.remaining[self.order[i - 1][1]]
+        self.dirty_from = len(self.order)
+
+    def plan(self, days=7, start=None):
+        # returns [(day, [(task id, minutes), ...]), ...] and the tasks that
+        # would only be finished after their deadline as [(task id, day)]
+        self.refresh()
+        start = start or date.today()
+        capacity = self.daily_minutes
+        horizon = days * capacity
+        schedule = [(start + timedelta(days=d), []) for d in range(days)]
+        late = []
+
+        for i, (_, task_id) in enumerate(self.order):
+            begin = self.starts[i]
+            left = self.remaining[task_id]
+            if not left:
+                continue
+
+            finish = start + timedelta(days=(begin + left - 1) // capacity)
+            deadline = self.deadlines[task_id]
+            if deadline is not None and finish > deadline:
+                late.append((task_id, finish))
+
+            while left and begin < horizon:
+                day = begin // capacity
+                chunk = min(left, (day + 1) * capacity - begin)
+                schedule[day][1].append((task_id, chunk))
+                begin += chunk
+                left -= chunk
+
+        return schedule, late
@@ -0,0 +1,71 @@
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import storage
+from models import Book
+from search import SearchIndex
+
+# Usage: python benchmark.py [number of books]
+# Builds a throwaway catalog in a temp folder and reports, per backend, the
+# time to load the catalog, the time to build the search index, the memory
+# held right after loading and the memory per book once every book has been
+# touched.
+
+
+def make_books(count):
+    books = []
+    for i in range(count):
+        book = Book(f"Title number {i}", f"Author {i % 5000}", i + 1)
+        book.available = i % 3 != 0
+        books.append(book)
+    return books
+
+
+def measure(make_backend, count):
+    start = time.perf_counter()
+    books = make_backend().load_books()
+    loaded = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    for number, (title, author) in enumerate(books.scan()):
+        index.add(number, title, author)
+    indexed = time.perf_counter() - start
+    del books, index
+
+    tracemalloc.start()
+    books = make_backend().load_books()
+    after_load, _ = tracemalloc.get_traced_memory()
+    for book in books:
+        book.available
+    after_touch, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"  load catalog      : {loaded * 1000:.0f} ms")
+    print(f"  build search index: {indexed * 1000:.0f} ms")
+    print(f"  memory after load : {after_load / 1024 / 1024:.1f} MB")
+    print(f"  memory per book   : {after_touch / count:.0f} bytes (all books loaded)")
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+    books = make_books(count)
+
+    with tempfile.TemporaryDirectory() as folder:
+        json_backend = storage.JsonStorage(os.path.join(folder, "library_data.json"))
+        sqlite_backend = storage.SqliteStorage(os.path.join(folder, "library.db"))
+        json_backend.save_books(books)
+        sqlite_backend.save_books(books)
+        del books
+
+        print(f"{count} books, JSON backend:")
+        measure(lambda: storage.JsonStorage(json_backend.path), count)
+        print(f"{count} books, SQLite backend:")
+        measure(lambda: storage.SqliteStorage(os.path.join(folder, "library.db")), count)
+
+
+if __name__ == "__main__":
+    main()
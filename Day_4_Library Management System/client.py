@@ -0,0 +1,112 @@
+import json
+import socket
+import sys
+
+from models import PAGE_SIZE
+from server import HOST, PORT
+
+
+# A front-desk terminal for server.py: same menu as main.py, but every
+# action goes to the circulation desk, so any number of terminals can work
+# on the same catalog at once.
+
+class DeskConnection:
+    def __init__(self, host=HOST, port=PORT):
+        self.sock = socket.create_connection((host, port))
+        self.file = self.sock.makefile("rwb")
+
+    def request(self, **request):
+        self.file.write(json.dumps(request).encode() + b"\n")
+        self.file.flush()
+        return json.loads(self.file.readline())
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def menu():
+    print("\n=== LIBRARY FRONT DESK ===")
+    print("1. Add Book")
+    print("2. Borrow Book")
+    print("3. Return Book")
+    print("4. Show All Books")
+    print("5. Search Books")
+    print("6. Exit")
+
+
+def print_books(books):
+    for book in books:
+        status = "Available" if book["available"] else "Borrowed"
+        print(f"{book['book']}. {book['title']} by {book['author']} [{status}]")
+
+
+def show_books(desk):
+    start = 1
+    while True:
+        response = desk.request(cmd="list", start=start, count=PAGE_SIZE)
+        if not response["books"]:
+            if start == 1:
+                print("No books in library.")
+            return
+        print_books(response["books"])
+        start += PAGE_SIZE
+        if start > response["total"]:
+            return
+        if input("-- Enter for more, q to stop: ").strip().lower() == "q":
+            return
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    try:
+        desk = DeskConnection(HOST, port)
+    except OSError:
+        print(f"Cannot reach the circulation desk on {HOST}:{port}. Is server.py running?")
+        return
+
+    while True:
+        menu()
+        choice = input("Choose an option: ")
+
+        if choice == "1":
+            title = input("Book title: ")
+            author = input("Author: ")
+            desk.request(cmd="add", title=title, author=author)
+            print("Book added.")
+
+        elif choice == "2":
+            number = int(input("Book number to borrow: "))
+            borrower = input("Borrower name: ")
+            response = desk.request(cmd="borrow", book=number, borrower=borrower)
+            if response["ok"]:
+                print(f"Book borrowed. Due back {response['due_at'][:10]}.")
+            else:
+                print(f"Cannot borrow: {response['error']}.")
+
+        elif choice == "3":
+            number = int(input("Book number to return: "))
+            response = desk.request(cmd="return", book=number)
+            print("Book returned." if response["ok"] else f"Cannot return: {response['error']}.")
+
+        elif choice == "4":
+            show_books(desk)
+
+        elif choice == "5":
+            response = desk.request(cmd="search", query=input("Search title or author: "))
+            if response["books"]:
+                print_books(response["books"])
+            else:
+                print("No matching books.")
+
+        elif choice == "6":
+            desk.close()
+            print("Goodbye!")
+            break
+
+        else:
+            print("Invalid option.")
+
+
+if __name__ == "__main__":
+    main()
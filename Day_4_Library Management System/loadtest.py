@@ -0,0 +1,103 @@
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from loans import LoanBook
+from models import Book
+from server import CirculationDesk, start_server
+from storage import SqliteStorage
+
+# Usage: python loadtest.py [clients] [requests per client]
+# Starts a circulation desk on a throwaway SQLite catalog, then connects the
+# given number of terminals over TCP. First every terminal tries to borrow
+# the same book at the same moment (exactly one may succeed), then they all
+# borrow and return random books from a small hot set as fast as they can.
+
+BOOKS = 1000
+HOT_BOOKS = 20
+
+
+async def connect(port):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def request(**payload):
+        writer.write(json.dumps(payload).encode() + b"\n")
+        await writer.drain()
+        return json.loads(await reader.readline())
+
+    return request, writer
+
+
+async def terminal(port, requests, start, stats):
+    request, writer = await connect(port)
+    await start.wait()
+
+    for _ in range(requests):
+        number = random.randint(1, HOT_BOOKS)
+        cmd = random.choice(["borrow", "return"])
+        response = await request(cmd=cmd, book=number, borrower="load test")
+        stats[cmd, response["ok"]] = stats.get((cmd, response["ok"]), 0) + 1
+
+    writer.close()
+
+
+async def race_for_one_book(port, clients):
+    connections = [await connect(port) for _ in range(clients)]
+    responses = await asyncio.gather(*(request(cmd="borrow", book=HOT_BOOKS + 1) for request, _ in connections))
+    for _, writer in connections:
+        writer.close()
+    return sum(1 for response in responses if response["ok"])
+
+
+async def run(clients, requests):
+    with tempfile.TemporaryDirectory() as folder:
+        storage = SqliteStorage(os.path.join(folder, "library.db"))
+        storage.save_books([Book(f"Book {i}", f"Author {i % 50}", i) for i in range(1, BOOKS + 1)])
+
+        desk = CirculationDesk(storage, LoanBook(os.path.join(folder, "loans.log")))
+        server, flusher = await start_server(desk, port=0)
+        port = server.sockets[0].getsockname()[1]
+
+        winners = await race_for_one_book(port, clients)
+        print(f"{clients} terminals borrowed the same book at once: {winners} succeeded (expected 1)")
+
+        stats = {}
+        start = asyncio.Event()
+        tasks = [asyncio.create_task(terminal(port, requests, start, stats)) for _ in range(clients)]
+        await asyncio.sleep(0.1)  # let every terminal connect first
+
+        began = time.perf_counter()
+        start.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - began
+
+        flusher.cancel()
+        server.close()
+        await server.wait_closed()
+        desk.flush()
+
+        total = clients * requests
+        print(f"{total} requests from {clients} terminals in {elapsed:.2f}s: {total / elapsed:.0f} requests/s")
+        for cmd in ("borrow", "return"):
+            print(f"  {cmd}: {stats.get((cmd, True), 0)} ok, {stats.get((cmd, False), 0)} refused")
+
+        # every successful borrow of a hot book is matched by a return, or the book is still out
+        stored = {book.id: book.available for book in storage.load_books()}
+        out = sum(1 for number in range(1, HOT_BOOKS + 1) if not stored[number])
+        balance = stats.get(("borrow", True), 0) - stats.get(("return", True), 0)
+        print(f"  books still out: {out}, borrows minus returns: {balance} (must match)")
+        storage.conn.close()
+
+
+def main():
+    clients = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    requests = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    asyncio.run(run(clients, requests))
+
+
+if __name__ == "__main__":
+    main()
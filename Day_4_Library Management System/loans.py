@@ -0,0 +1,115 @@
+import bisect
+import json
+import os
+from datetime import datetime, timedelta
+
+LOANS_FILE = "loans.log"
+LOAN_DAYS = 14
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+
+# Loans are kept in an append-only log with one JSON line per event:
+#   {"op": "borrow", "loan": 7, "book": 3, "title": ..., "borrower": ...,
+#    "borrowed_at": ..., "due_at": ...}
+#   {"op": "return", "loan": 7, "returned_at": ...}
+# Replaying it builds the indexes below, so overdue and due-soon lists only
+# read the matching part of the sorted due list, and a borrower's loans are
+# one dict lookup away.
+
+class LoanBook:
+    def __init__(self, path=LOANS_FILE):
+        self.path = path
+        self.loans = {}  # loan id -> loan
+        self.open_by_book = {}  # book id -> open loan id
+        self.by_borrower = {}  # borrower -> [loan id, ...]
+        self.due = []  # sorted (due_at, loan id) of open loans
+        self.next_id = 1
+        self.file = None  # opened for appending on the first new event
+        self.load()
+
+    def load(self):
+        if not os.path.exists(self.path):
+            return
+
+        with open(self.path, "rb+") as f:
+            offset = 0
+            for line in f:
+                try:
+                    event = json.loads(line) if line.endswith(b"\n") else None
+                except ValueError:
+                    event = None
+                if event is None:
+                    f.truncate(offset)  # half-written last line from a crash
+                    break
+                self.apply(event, replay=True)
+                offset += len(line)
+
+        # sorted once here instead of one insort per replayed loan
+        self.due = sorted((self.loans[loan_id]["due_at"], loan_id) for loan_id in self.open_by_book.values())
+
+    def apply(self, event, replay=False):
+        if event["op"] == "borrow":
+            loan = {key: value for key, value in event.items() if key != "op"}
+            loan["returned_at"] = None
+            self.loans[loan["loan"]] = loan
+            self.open_by_book[loan["book"]] = loan["loan"]
+            self.by_borrower.setdefault(loan["borrower"], []).append(loan["loan"])
+            if not replay:
+                bisect.insort(self.due, (loan["due_at"], loan["loan"]))
+            self.next_id = max(self.next_id, loan["loan"] + 1)
+
+        elif event["op"] == "return":
+            loan = self.loans[event["loan"]]
+            loan["returned_at"] = event["returned_at"]
+            self.open_by_book.pop(loan["book"], None)
+            if replay:
+                return
+            i = bisect.bisect_left(self.due, (loan["due_at"], loan["loan"]))
+            if i < len(self.due) and self.due[i] == (loan["due_at"], loan["loan"]):
+                del self.due[i]
+
+    def record(self, event):
+        if self.file is None:
+            self.file = open(self.path, "a")
+        self.file.write(json.dumps(event) + "\n")
+        self.file.flush()
+        self.apply(event)
+
+    def borrow(self, book, borrower, days=LOAN_DAYS, now=None):
+        now = now or datetime.now()
+        loan_id = self.next_id
+        self.record({
+            "op": "borrow",
+            "loan": loan_id,
+            "book": book.id,
+            "title": book.title,
+            "borrower": borrower,
+            "borrowed_at": now.strftime(TIME_FORMAT),
+            "due_at": (now + timedelta(days=days)).strftime(TIME_FORMAT)
+        })
+        return self.loans[loan_id]
+
+    def return_book(self, book, now=None):
+        loan_id = self.open_by_book.get(book.id)
+        if loan_id is None:
+            return None
+
+        now = now or datetime.now()
+        self.record({"op": "return", "loan": loan_id, "returned_at": now.strftime(TIME_FORMAT)})
+        return self.loans[loan_id]
+
+    def due_between(self, start, end):
+        # open loans with start <= due_at < end; start=None means from the beginning
+        lo = 0 if start is None else bisect.bisect_left(self.due, (start.strftime(TIME_FORMAT),))
+        hi = bisect.bisect_left(self.due, (end.strftime(TIME_FORMAT),))
+        return [self.loans[loan_id] for _, loan_id in self.due[lo:hi]]
+
+    def overdue(self, now=None):
+        return self.due_between(None, now or datetime.now())
+
+    def due_tomorrow(self, now=None):
+        today = (now or datetime.now()).replace(hour=0, minute=0, second=0, microsecond=0)
+        return self.due_between(today + timedelta(days=1), today + timedelta(days=2))
+
+    def loans_for(self, borrower):
+        return [self.loans[loan_id] for loan_id in self.by_borrower.get(borrower, [])]
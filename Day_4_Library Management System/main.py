@@ -1,5 +1,7 @@
-from models import Book
-from storage import load_books, save_books
+from loans import LoanBook
+from models import PAGE_SIZE, Book
+from search import SearchIndex
+from storage import get_storage
 
 
 def menu():
@@ -8,7 +10,12 @@ def menu():
     print("2. Borrow Book")
     print("3. Return Book")
     print("4. Show All Books")
-    print("5. Exit")
+    print("5. Search Books")
+    print("6. Borrow by Search")
+    print("7. Overdue Loans")
+    print("8. Loans Due Tomorrow")
+    print("9. Loans of a Borrower")
+    print("10. Exit")
 
 
 def show_books(books):
@@ -16,13 +23,61 @@ def show_books(books):
         print("No books in library.")
         return
 
-    for i, book in enumerate(books, 1):
+    # one page at a time, so only the books actually shown get loaded
+    for i in range(len(books)):
+        if i and i % PAGE_SIZE == 0:
+            if input("-- Enter for more, q to stop: ").strip().lower() == "q":
+                return
+        book = books[i]
+        status = "Available" if book.available else "Borrowed"
+        print(f"{i + 1}. {book.title} by {book.author} [{status}]")
+
+
+def search_books(books, index):
+    query = input("Search title or author: ")
+    results = index.search(query)
+    if not results:
+        print("No matching books.")
+        return []
+
+    for i, number in enumerate(results, 1):
+        book = books[number]
         status = "Available" if book.available else "Borrowed"
         print(f"{i}. {book.title} by {book.author} [{status}]")
+    return results
+
+
+def borrow(storage, books, loans, book):
+    borrower = input("Borrower name: ")
+    if storage.borrow_book(books, book):
+        loan = loans.borrow(book, borrower)
+        print(f"Book borrowed. Due back {loan['due_at'][:10]}.")
+    else:
+        print("Book already borrowed.")
+
+
+def show_loans(loans, empty_message):
+    if not loans:
+        print(empty_message)
+        return
+
+    for loan in loans:
+        status = f"returned {loan['returned_at'][:10]}" if loan["returned_at"] else f"due {loan['due_at'][:10]}"
+        print(f"- {loan['title']} | {loan['borrower']} | borrowed {loan['borrowed_at'][:10]} | {status}")
+
+
+def build_index(books):
+    index = SearchIndex()
+    for number, (title, author) in enumerate(books.scan()):
+        index.add(number, title, author)
+    return index
 
 
 def main():
-    books = load_books()
+    storage = get_storage()
+    books = storage.load_books()
+    loans = LoanBook()
+    index = None  # built on the first search, so the menu shows up right away
 
     while True:
         menu()
@@ -31,30 +86,49 @@ def main():
         if choice == "1":
             title = input("Book title: ")
             author = input("Author: ")
-            books.append(Book(title, author))
-            save_books(books)
+            storage.add_book(books, Book(title, author))
+            if index is not None:
+                index.add(len(books) - 1, title, author)
             print("Book added.")
 
         elif choice == "2":
             show_books(books)
             idx = int(input("Book number to borrow: ")) - 1
-            if books[idx].borrow():
-                save_books(books)
-                print("Book borrowed.")
-            else:
-                print("Book already borrowed.")
+            borrow(storage, books, loans, books[idx])
 
         elif choice == "3":
             show_books(books)
             idx = int(input("Book number to return: ")) - 1
-            books[idx].return_book()
-            save_books(books)
+            storage.return_book(books, books[idx])
+            loans.return_book(books[idx])
             print("Book returned.")
 
         elif choice == "4":
             show_books(books)
 
         elif choice == "5":
+            index = index or build_index(books)
+            search_books(books, index)
+
+        elif choice == "6":
+            index = index or build_index(books)
+            results = search_books(books, index)
+            if not results:
+                continue
+            pick = int(input("Result number to borrow: ")) - 1
+            borrow(storage, books, loans, books[results[pick]])
+
+        elif choice == "7":
+            show_loans(loans.overdue(), "No overdue loans.")
+
+        elif choice == "8":
+            show_loans(loans.due_tomorrow(), "Nothing is due tomorrow.")
+
+        elif choice == "9":
+            borrower = input("Borrower name: ")
+            show_loans(loans.loans_for(borrower), "No loans for that borrower.")
+
+        elif choice == "10":
             print("Goodbye!")
             break
 
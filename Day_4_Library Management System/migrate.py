@@ -0,0 +1,42 @@
+import os
+import sys
+
+from storage import DATA_FILE, DB_FILE, JsonStorage, SqliteStorage
+
+USAGE = "Usage: python migrate.py json-to-sqlite | sqlite-to-json [--force]"
+
+
+def main():
+    args = [arg for arg in sys.argv[1:] if arg != "--force"]
+    force = "--force" in sys.argv[1:]
+    if len(args) != 1 or args[0] not in ("json-to-sqlite", "sqlite-to-json"):
+        print(USAGE)
+        return
+
+    source_file = DATA_FILE if args[0] == "json-to-sqlite" else DB_FILE
+    if not os.path.exists(source_file):
+        print(f"{source_file} does not exist, nothing to copy.")
+        return
+
+    if args[0] == "json-to-sqlite":
+        source, target = JsonStorage(), SqliteStorage()
+    else:
+        source, target = SqliteStorage(), JsonStorage()
+
+    books = source.load_books()
+    if len(books) == 0:
+        print(f"{source_file} holds no books, nothing to copy.")
+        return
+
+    # copying replaces the whole target catalog
+    existing = len(target.load_books())
+    if existing and not force:
+        print(f"The target already holds {existing} books. Run again with --force to replace them.")
+        return
+
+    target.save_books(books)
+    print(f"Copied {len(books)} books ({args[0]}).")
+
+
+if __name__ == "__main__":
+    main()
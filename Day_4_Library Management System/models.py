@@ -1,5 +1,11 @@
+PAGE_SIZE = 100
+
+
 class Book:
-    def __init__(self, title, author):
+    __slots__ = ("id", "title", "author", "available")
+
+    def __init__(self, title, author, book_id=None):
+        self.id = book_id
         self.title = title
         self.author = author
         self.available = True
@@ -15,6 +21,7 @@ class Book:
 
     def to_dict(self):
         return {
+            "id": self.id,
             "title": self.title,
             "author": self.author,
             "available": self.available
@@ -22,6 +29,53 @@ class Book:
 
     @staticmethod
     def from_dict(data):
-        book = Book(data["title"], data["author"])
+        book = Book(data["title"], data["author"], data.get("id"))
         book.available = data["available"]
         return book
+
+    @staticmethod
+    def from_row(row):
+        book = Book(row[1], row[2], row[0])
+        book.available = bool(row[3])
+        return book
+
+
+class Catalog:
+    # List-like view of the stored books. Book objects are built a page at a
+    # time, the first time something in that page is shown or borrowed.
+    # fetch_page(start, size) returns the Books of one page and scan() yields
+    # (title, author) for every book without building any Book objects.
+    def __init__(self, count, fetch_page, scan):
+        self.count = count
+        self.fetch_page = fetch_page
+        self.scan = scan
+        self.pages = {}  # page number -> list of Book
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, number):
+        if number < 0:
+            number += self.count
+        if not 0 <= number < self.count:
+            raise IndexError("book number out of range")
+
+        page = number // PAGE_SIZE
+        if page not in self.pages:
+            self.pages[page] = self.fetch_page(page * PAGE_SIZE, PAGE_SIZE)
+        return self.pages[page][number % PAGE_SIZE]
+
+    def __iter__(self):
+        for number in range(self.count):
+            yield self[number]
+
+    def loaded(self, number):
+        # the Book if its page has been built already, otherwise None
+        page = self.pages.get(number // PAGE_SIZE)
+        return page[number % PAGE_SIZE] if page else None
+
+    def append(self, book):
+        if self.count % PAGE_SIZE:
+            self[self.count - 1]  # load the last page before adding to it
+        self.pages.setdefault(self.count // PAGE_SIZE, []).append(book)
+        self.count += 1
@@ -0,0 +1,146 @@
+import heapq
+import re
+from array import array
+from bisect import bisect_left
+from collections import deque
+from itertools import groupby
+from operator import itemgetter
+
+TITLE_WEIGHT = 2
+AUTHOR_WEIGHT = 1
+COMPLETION_LIMIT = 50  # tokens a type-ahead prefix may expand to
+PREFIX_POSTINGS_LIMIT = 200000  # books a type-ahead prefix may expand to
+
+TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text):
+    return TOKEN_RE.findall(text.lower())
+
+
+# Inverted index over title and author words, plus a prefix trie. Books are
+# referred to by their position in the catalog list. Every query word must
+# match; the last word is also treated as a prefix so results show up while
+# the user is still typing.
+# Each word keeps two arrays of book numbers: books with the word in the
+# title, and books with it only in the author. Books are added in catalog
+# order, so the arrays stay sorted without ever sorting them: checking a
+# book is a bisect, and reading title hits before author hits gives a
+# word's books in falling weight. A search walks its rarest word only,
+# checks the other words by bisect, and stops once no book left can get
+# into the top results, so common words cost no more than rare ones.
+class SearchIndex:
+    def __init__(self):
+        self.postings = {}  # word -> (title book numbers, author-only book numbers)
+        self.trie = {}  # one nested dict per letter, "" marks a whole word
+
+    def add(self, number, title, author):
+        for token in tokenize(title):
+            self.add_token(token, number, 0)
+        for token in tokenize(author):
+            self.add_token(token, number, 1)
+
+    def add_token(self, token, number, field):
+        postings = self.postings.get(token)
+        if postings is None:
+            postings = self.postings[token] = (array("i"), array("i"))
+            node = self.trie
+            for char in token:
+                node = node.setdefault(char, {})
+            node[""] = token
+
+        numbers = postings[field]
+        if numbers and numbers[-1] == number:
+            return  # word repeated in the same field
+        if field == 1 and postings[0] and postings[0][-1] == number:
+            return  # already counted with the higher title weight
+        numbers.append(number)
+
+    def complete(self, prefix, limit=COMPLETION_LIMIT):
+        node = self.trie
+        for char in prefix:
+            node = node.get(char)
+            if node is None:
+                return []
+
+        # breadth first, so the shortest completions come first
+        words = []
+        queue = deque([node])
+        while queue and len(words) < limit:
+            node = queue.popleft()
+            for char, child in node.items():
+                if char == "":
+                    words.append(child)
+                else:
+                    queue.append(child)
+        return words[:limit]
+
+    def term(self, token, prefix):
+        # [(weight, sorted book numbers), ...] for one query word, highest weight first;
+        # a prefix stops taking completions once they would pass PREFIX_POSTINGS_LIMIT books
+        lists = []
+        if token in self.postings:
+            title, author = self.postings[token]
+            lists += [(TITLE_WEIGHT, title), (AUTHOR_WEIGHT, author)]
+        if prefix:
+            size = sum(len(numbers) for _, numbers in lists)
+            for word in self.complete(token):
+                if word == token:
+                    continue
+                title, author = self.postings[word]
+                if size and size + len(title) + len(author) > PREFIX_POSTINGS_LIMIT:
+                    break
+                lists += [(TITLE_WEIGHT / 2, title), (AUTHOR_WEIGHT / 2, author)]
+                size += len(title) + len(author)
+        lists.sort(key=lambda item: -item[0])
+        return [(weight, numbers) for weight, numbers in lists if numbers]
+
+    def search(self, query, limit=10):
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        terms = [self.term(token, i == len(tokens) - 1) for i, token in enumerate(tokens)]
+        if not all(terms):
+            return []
+        terms.sort(key=lambda term: sum(len(numbers) for _, numbers in term))
+        rarest, others = terms[0], terms[1:]
+        others_best = sum(term[0][0] for term in others)  # the most the other words can add
+
+        top = []  # min-heap of the best (score, -book number) so far
+        seen = set() if len(rarest) > 2 else None  # completions can share books
+        for weight, group in groupby(rarest, key=itemgetter(0)):
+            bound = weight + others_best
+            if len(top) == limit and bound < top[0][0]:
+                break
+            lists = [numbers for _, numbers in group]
+            for number in lists[0] if len(lists) == 1 else heapq.merge(*lists):
+                if len(top) == limit and (bound, -number) < top[0]:
+                    break  # the rest of this group has higher numbers and cannot rank higher
+                if seen is not None:
+                    if number in seen:
+                        continue
+                    seen.add(number)
+
+                score = weight
+                for term in others:
+                    found = weight_in(term, number)
+                    if not found:
+                        break
+                    score += found
+                else:
+                    if len(top) < limit:
+                        heapq.heappush(top, (score, -number))
+                    elif (score, -number) > top[0]:
+                        heapq.heapreplace(top, (score, -number))
+
+        return [-number for _, number in sorted(top, reverse=True)]
+
+
+def weight_in(term, number):
+    # the weight a book gets from one query word, 0 if the word does not match it
+    for weight, numbers in term:
+        i = bisect_left(numbers, number)
+        if i < len(numbers) and numbers[i] == number:
+            return weight
+    return 0
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import sys
+
+from loans import LoanBook
+from models import Book
+from search import SearchIndex
+from storage import get_storage
+
+HOST = "127.0.0.1"
+PORT = 8765
+FLUSH_INTERVAL = 0.5  # seconds between batched writes
+
+
+# The circulation desk owns the catalog; every front-desk terminal talks to
+# it over TCP with one JSON object per line, e.g.
+#   {"cmd": "borrow", "book": 3, "borrower": "ann", "version": 7}
+#       ->  {"ok": true, "version": 8, "due_at": "..."}
+# Books are numbered from 1 like in the menu. Each book has a version that
+# goes up on every borrow/return; a request that sends the version it last
+# saw is refused if someone changed the book in between. All requests run on
+# one event loop and the check-and-flip in borrow() never awaits, so two
+# terminals can never both borrow the same copy. Changed books are written
+# to storage in one batch every FLUSH_INTERVAL seconds.
+
+class CirculationDesk:
+    def __init__(self, storage, loans=None):
+        self.storage = storage
+        self.books = storage.load_books()
+        self.loans = loans if loans is not None else LoanBook()
+        self.index = None
+        self.versions = {}  # book number -> version
+        self.dirty = set()  # book numbers changed since the last flush
+
+    def handle(self, request):
+        cmd = request.get("cmd")
+        if cmd == "list":
+            return self.list_books(request.get("start", 1), request.get("count", 20))
+        if cmd == "search":
+            return self.search(request["query"])
+        if cmd == "borrow":
+            return self.borrow(request["book"], request.get("borrower", ""), request.get("version"))
+        if cmd == "return":
+            return self.return_book(request["book"], request.get("version"))
+        if cmd == "add":
+            return self.add(request["title"], request["author"])
+        return {"ok": False, "error": f"unknown command {cmd!r}"}
+
+    def describe(self, number):
+        book = self.book(number)
+        return {
+            "book": number,
+            "title": book.title,
+            "author": book.author,
+            "available": book.available,
+            "version": self.versions.get(number, 0)
+        }
+
+    def book(self, number):
+        if not 1 <= number <= len(self.books):
+            raise IndexError(f"no book number {number}")
+        return self.books[number - 1]
+
+    def list_books(self, start, count):
+        stop = min(start + count, len(self.books) + 1)
+        return {"ok": True, "total": len(self.books), "books": [self.describe(n) for n in range(start, stop)]}
+
+    def search(self, query):
+        if self.index is None:
+            self.index = SearchIndex()
+            for number, (title, author) in enumerate(self.books.scan()):
+                self.index.add(number, title, author)
+        return {"ok": True, "books": [self.describe(n + 1) for n in self.index.search(query)]}
+
+    def check_version(self, number, version):
+        if version is not None and version != self.versions.get(number, 0):
+            return {"ok": False, "error": "book changed since you looked", "version": self.versions.get(number, 0)}
+        return None
+
+    def changed(self, number):
+        self.versions[number] = self.versions.get(number, 0) + 1
+        self.dirty.add(number)
+        return {"ok": True, "version": self.versions[number]}
+
+    def borrow(self, number, borrower, version=None):
+        book = self.book(number)
+        conflict = self.check_version(number, version)
+        if conflict:
+            return conflict
+        if not book.borrow():
+            return {"ok": False, "error": "book already borrowed", "version": self.versions.get(number, 0)}
+        loan = self.loans.borrow(book, borrower)
+        return dict(self.changed(number), due_at=loan["due_at"])
+
+    def return_book(self, number, version=None):
+        book = self.book(number)
+        conflict = self.check_version(number, version)
+        if conflict:
+            return conflict
+        if book.available:
+            return {"ok": False, "error": "book is not borrowed", "version": self.versions.get(number, 0)}
+        book.return_book()
+        self.loans.return_book(book)
+        return self.changed(number)
+
+    def add(self, title, author):
+        self.storage.add_book(self.books, Book(title, author))
+        if self.index is not None:
+            self.index.add(len(self.books) - 1, title, author)
+        return {"ok": True, "book": len(self.books)}
+
+    def flush(self):
+        if not self.dirty:
+            return 0
+        changed = [self.books[number - 1] for number in self.dirty]
+        self.storage.update_books(self.books, changed)
+        self.dirty = set()
+        return len(changed)
+
+
+async def serve_client(desk, reader, writer):
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                response = desk.handle(json.loads(line))
+            except (ValueError, KeyError, IndexError, TypeError) as e:
+                response = {"ok": False, "error": str(e)}
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+
+async def flush_loop(desk):
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        desk.flush()
+
+
+async def start_server(desk, host=HOST, port=PORT):
+    server = await asyncio.start_server(lambda r, w: serve_client(desk, r, w), host, port)
+    flusher = asyncio.create_task(flush_loop(desk))
+    return server, flusher
+
+
+async def run(desk, host, port):
+    server, flusher = await start_server(desk, host, port)
+    print(f"Circulation desk serving {len(desk.books)} books on {host}:{port} (Ctrl+C to stop)")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        flusher.cancel()
+        desk.flush()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    desk = CirculationDesk(get_storage())
+    try:
+        asyncio.run(run(desk, HOST, port))
+    except KeyboardInterrupt:
+        print("Server stopped.")
+
+
+if __name__ == "__main__":
+    main()
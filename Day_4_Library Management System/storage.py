@@ -1,19 +1,177 @@
 import json
 import os
-from models import Book
+import sqlite3
+from array import array
+from models import Book, Catalog
 
 DATA_FILE = "library_data.json"
+DB_FILE = "library.db"
+BACKEND = os.environ.get("LIBRARY_BACKEND", "json")  # "json" or "sqlite"
 
 
-def load_books():
-    if not os.path.exists(DATA_FILE):
-        return []
+# Every backend offers the same calls, so main.py does not care where the
+# books live:
+#   load_books()                  -> Catalog (books are built on first use)
+#   save_books(books)             write the whole catalog
+#   add_book(books, book)         append and persist one new book
+#   update_books(books, changed)  persist the availability of changed books
+#   borrow_book(books, book)      -> True if this call borrowed it
+#   return_book(books, book)
+
+class JsonStorage:
+    # The file is parsed once into plain columns (ids, titles, authors,
+    # availability) instead of one dict per book; Book objects are only
+    # built for the pages of the catalog that get used.
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+        self.set_columns([])
+
+    def set_columns(self, rows):
+        self.ids = array("q", (row["id"] for row in rows))
+        self.titles = [row["title"] for row in rows]
+        self.authors = [row["author"] for row in rows]
+        self.available = bytearray(bool(row["available"]) for row in rows)
+
+    def load_books(self):
+        rows = []
+        if os.path.exists(self.path):
+            with open(self.path, "r") as f:
+                rows = json.load(f)
+
+        for number, row in enumerate(rows, 1):
+            row.setdefault("id", number)
+        self.set_columns(rows)
+        return Catalog(len(self.titles), self.fetch_page, self.scan)
+
+    def fetch_page(self, start, size):
+        books = []
+        for i in range(start, min(start + size, len(self.titles))):
+            book = Book(self.titles[i], self.authors[i], self.ids[i])
+            book.available = bool(self.available[i])
+            books.append(book)
+        return books
+
+    def scan(self):
+        return zip(self.titles, self.authors)
+
+    def rows(self, books):
+        # books from this storage that were never touched come from the columns
+        own = isinstance(books, Catalog) and books.scan == self.scan
+        for number in range(len(books)):
+            book = books.loaded(number) if own else books[number]
+            if book is not None:
+                yield book.to_dict()
+            else:
+                yield {
+                    "id": self.ids[number],
+                    "title": self.titles[number],
+                    "author": self.authors[number],
+                    "available": bool(self.available[number])
+                }
+
+    def save_books(self, books):
+        rows = list(self.rows(books))
+        with open(self.path, "w") as f:
+            json.dump(rows, f, indent=4)
+        self.set_columns(rows)
+
+    def add_book(self, books, book):
+        book.id = len(books) + 1
+        books.append(book)
+        self.save_books(books)
+
+    def update_books(self, books, changed):
+        self.save_books(books)
+
+    def borrow_book(self, books, book):
+        if not book.borrow():
+            return False
+        self.save_books(books)
+        return True
+
+    def return_book(self, books, book):
+        book.return_book()
+        self.save_books(books)
+
 
-    with open(DATA_FILE, "r") as f:
-        data = json.load(f)
-        return [Book.from_dict(b) for b in data]
+class SqliteStorage:
+    # Borrow and return are single-row UPDATEs inside a transaction, so a
+    # checkout no longer rewrites the whole catalog.
+    def __init__(self, path=DB_FILE):
+        self.conn = sqlite3.connect(path)
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS books (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    author TEXT NOT NULL,
+                    available INTEGER NOT NULL DEFAULT 1
+                )""")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS books_title ON books (title COLLATE NOCASE)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS books_author ON books (author COLLATE NOCASE)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS books_available ON books (available)")
+
+    def load_books(self):
+        count = self.conn.execute("SELECT COUNT(*) FROM books").fetchone()[0]
+        return Catalog(count, self.fetch_page, self.scan)
+
+    def fetch_page(self, start, size):
+        rows = self.conn.execute(
+            "SELECT id, title, author, available FROM books ORDER BY id LIMIT ? OFFSET ?",
+            (size, start)
+        )
+        return [Book.from_row(row) for row in rows]
+
+    def scan(self):
+        return self.conn.execute("SELECT title, author FROM books ORDER BY id")
+
+    def save_books(self, books):
+        rows = [(b.id, b.title, b.author, int(b.available)) for b in books]
+        with self.conn:
+            self.conn.execute("DELETE FROM books")
+            self.conn.executemany("INSERT INTO books (id, title, author, available) VALUES (?, ?, ?, ?)", rows)
+
+    def add_book(self, books, book):
+        books.append(book)  # before the INSERT, so the last page is read without it
+        with self.conn:
+            cur = self.conn.execute(
+                "INSERT INTO books (title, author, available) VALUES (?, ?, ?)",
+                (book.title, book.author, int(book.available))
+            )
+        book.id = cur.lastrowid
+
+    def update_books(self, books, changed):
+        with self.conn:
+            self.conn.executemany(
+                "UPDATE books SET available = ? WHERE id = ?",
+                ((int(b.available), b.id) for b in changed)
+            )
+
+    def borrow_book(self, books, book):
+        # the WHERE clause makes this safe even if another process got there first
+        with self.conn:
+            cur = self.conn.execute("UPDATE books SET available = 0 WHERE id = ? AND available = 1", (book.id,))
+        book.available = False
+        return cur.rowcount == 1
+
+    def return_book(self, books, book):
+        with self.conn:
+            self.conn.execute("UPDATE books SET available = 1 WHERE id = ?", (book.id,))
+        book.return_book()
+
+
+def get_storage(backend=None):
+    backend = backend or BACKEND
+    if backend == "sqlite":
+        return SqliteStorage()
+    if backend == "json":
+        return JsonStorage()
+    raise ValueError(f"Unknown storage backend: {backend}")
+
+
+def load_books():
+    return get_storage().load_books()
 
 
 def save_books(books):
-    with open(DATA_FILE, "w") as f:
-        json.dump([b.to_dict() for b in books], f, indent=4)
+    get_storage().save_books(books)
@@ -0,0 +1,223 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from itertools import islice
+
+from hashing import fingerprint, load_config, wrap_legacy
+from vaultfile import DATA_FILE, fingerprint_salt, load_entries, save_entries
+
+STALE_DAYS = 180
+TIME_FORMAT = "%Y-%m-%d %H:%M:%S"
+CHUNK_SIZE = 5000
+
+
+# Audits one or more vault files: passwords reused across sites of a vault
+# (same fingerprint, see hashing.py), weak entries (strength recorded when the
+# entry was added, or an old sha256 hash that matches a word list of common
+# passwords) and entries not changed in STALE_DAYS. It can also re-hash
+# every legacy sha256 entry in bulk with the scheme configured in hashing.py.
+# Plaintext passwords are never stored, so the new hash is taken over the old
+# sha256 hex digest, and the fingerprint is kept so reuse is still found
+# afterwards. All hashing runs in a process pool.
+# Fingerprints cost as much as a password hash, so the word list is only
+# compared with the unsalted legacy entries.
+
+def sha256_chunk(words):
+    return [hashlib.sha256(word.encode()).hexdigest() for word in words]
+
+
+def fingerprint_chunk(args):
+    hashes, (vault_salt, algorithm, params) = args
+    return [fingerprint(old_hash, vault_salt, algorithm, params) for old_hash in hashes]
+
+
+def rehash_chunk(args):
+    items, (algorithm, params) = args
+    return [wrap_legacy(old_hash, algorithm, params, vault_salt) for old_hash, vault_salt in items]
+
+
+def entry_group(data, legacy_fingerprints, site):
+    # entries with the same group have the same password; None if unknown
+    if "fingerprint" in data:
+        return data["scheme"], json.dumps(data["params"], sort_keys=True), data["fingerprint"]
+    if "scheme" not in data:
+        return legacy_fingerprints.get(site, ("sha256", data["password_hash"]))
+    return None
+
+
+def run_in_pool(func, items, workers, label=None, total=None, chunk_size=CHUNK_SIZE, extra=None):
+    # yields (item, result) in input order, keeping at most 2 chunks per
+    # worker in flight; with a label it prints a progress line with the rate
+    items = iter(items)
+    done = 0
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(workers) as pool:
+        pending = deque()
+        while True:
+            while len(pending) < workers * 2:
+                chunk = list(islice(items, chunk_size))
+                if not chunk:
+                    break
+                job = chunk if extra is None else (chunk, extra)
+                pending.append((chunk, pool.submit(func, job)))
+            if not pending:
+                break
+
+            chunk, future = pending.popleft()
+            yield from zip(chunk, future.result())
+            done += len(chunk)
+            if label:
+                rate = done / max(time.perf_counter() - start, 1e-9)
+                progress = f"{done}/{total}" if total else str(done)
+                print(f"\r  {label}: {progress} ({rate:.0f}/s)", end="", flush=True)
+
+    if done and label:
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        print(f"\r  {label}: {done} in {elapsed:.2f}s ({done / elapsed:.0f}/s)")
+
+
+def read_words(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            word = line.rstrip("\r\n")
+            if word:
+                yield word
+
+
+def common_password_hits(vaults, wordlist, workers):
+    # sha256 of every word, compared against the legacy entries of all vaults at once
+    wanted = set()
+    for vault in vaults.values():
+        for data in vault.values():
+            if "scheme" not in data:
+                wanted.add(data["password_hash"])
+
+    hits = set()
+    if not wanted:
+        return hits
+    for _, value in run_in_pool(sha256_chunk, read_words(wordlist), workers, "word list hashed"):
+        if value in wanted:
+            hits.add(value)
+    return hits
+
+
+def fingerprint_legacy(path, vault, workers):
+    # legacy entries get the fingerprint they would have after re-hashing, so
+    # they are compared with the salted entries as well; only worth it when
+    # the vault has both kinds
+    vault_salt = fingerprint_salt(path)
+    legacy = [site for site, data in vault.items() if "scheme" not in data]
+    if vault_salt is None or not legacy or not any("fingerprint" in data for data in vault.values()):
+        return {}
+
+    algorithm, params = load_config()
+    group = (algorithm, json.dumps(params, sort_keys=True))
+    hashes = (vault[site]["password_hash"] for site in legacy)
+    results = run_in_pool(fingerprint_chunk, hashes, workers, "legacy entries fingerprinted",
+                          total=len(legacy), chunk_size=16, extra=(vault_salt, algorithm, params))
+    return {site: group + (value,) for (_, value), site in zip(results, legacy)}
+
+
+def audit_vault(vault, legacy_fingerprints, common_hashes, now):
+    by_group = {}
+    weak = []
+    stale = []
+    unknown = []
+    stale_before = (now - timedelta(days=STALE_DAYS)).strftime(TIME_FORMAT)
+
+    for site, data in vault.items():
+        group = entry_group(data, legacy_fingerprints, site)
+        if group is None:
+            unknown.append(site)
+        else:
+            by_group.setdefault(group, []).append(site)
+        if "scheme" not in data and data["password_hash"] in common_hashes:
+            weak.append((site, "common password"))
+        elif data.get("strength") in ("Weak", "Medium"):
+            weak.append((site, data["strength"]))
+        updated = data.get("updated_at")
+        if updated is None or updated < stale_before:
+            stale.append((site, updated or "never recorded"))
+
+    reused = [sites for sites in by_group.values() if len(sites) > 1]
+    return reused, weak, stale, unknown
+
+
+def print_report(path, vault, reused, weak, stale, unknown, encrypted):
+    print(f"\n{path}: {len(vault)} entries")
+
+    print(f"Reused passwords: {sum(len(sites) for sites in reused)} entries")
+    for sites in reused:
+        print("  same password: " + ", ".join(sites))
+    if unknown and not encrypted:
+        print(f"  {len(unknown)} salted entries were not compared: fingerprints are only kept "
+              "in an encrypted vault (pip install cryptography)")
+    elif unknown:
+        print(f"  {len(unknown)} entries have no fingerprint yet and were not compared; "
+              "verify their password once to add it: " + ", ".join(unknown))
+
+    print(f"Weak passwords: {len(weak)}")
+    for site, reason in weak:
+        print(f"  {site} ({reason})")
+
+    print(f"Not changed in {STALE_DAYS} days: {len(stale)}")
+    for site, updated in stale:
+        print(f"  {site} (last changed: {updated})")
+
+
+def audit(paths, wordlist=None, workers=None):
+    workers = workers or os.cpu_count()
+    vaults = {path: load_entries(path) for path in paths}
+    common_hashes = common_password_hits(vaults, wordlist, workers) if wordlist else set()
+
+    now = datetime.now()
+    for path, vault in vaults.items():
+        legacy_fingerprints = fingerprint_legacy(path, vault, workers)
+        print_report(path, vault, *audit_vault(vault, legacy_fingerprints, common_hashes, now),
+                     fingerprint_salt(path) is not None)
+
+
+def rehash(paths, workers=None):
+    workers = workers or os.cpu_count()
+    algorithm, params = load_config()
+    vaults = {path: load_entries(path) for path in paths}
+    legacy = [(path, site) for path, vault in vaults.items()
+              for site, data in vault.items() if "scheme" not in data]
+    if not legacy:
+        print("No legacy sha256 entries to re-hash.")
+        return 0
+
+    salts = {path: fingerprint_salt(path) for path in paths}
+    old_hashes = ((vaults[path][site]["password_hash"], salts[path]) for path, site in legacy)
+    results = run_in_pool(rehash_chunk, old_hashes, workers, "entries re-hashed",
+                          total=len(legacy), chunk_size=16, extra=(algorithm, params))
+    for (_, fields), (path, site) in zip(results, legacy):
+        vaults[path][site].update(fields)
+
+    for path, vault in vaults.items():
+        save_entries(path, vault, [site for site_path, site in legacy if site_path == path])
+    return len(legacy)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Audit password vault files.")
+    parser.add_argument("vaults", nargs="*", default=[DATA_FILE])
+    parser.add_argument("--wordlist", help="common passwords, one per line")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--rehash", action="store_true", help="re-hash legacy entries (see hashing.py)")
+    args = parser.parse_args()
+
+    audit(args.vaults, args.wordlist, args.workers)
+    if args.rehash:
+        print()
+        rehash(args.vaults, args.workers)
+
+
+if __name__ == "__main__":
+    main()
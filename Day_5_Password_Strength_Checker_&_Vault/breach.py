@@ -0,0 +1,96 @@
+import hashlib
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+
+BREACH_FILE = "breached.bloom"
+FALSE_POSITIVE_RATE = 0.001
+MAGIC = b"PWBLOOM1"
+HEADER = struct.Struct("<8sQI")  # magic, number of bits, number of hashes
+
+
+# A Bloom filter of known leaked passwords. The filter file is memory-mapped,
+# so opening it costs nothing no matter how large it is and the OS only pages
+# in the few bytes each lookup touches. A lookup can say "maybe breached"
+# for a password that is not in the list (about 1 in 1000 by default) but
+# never misses one that is.
+
+def bit_positions(password, bits, hashes):
+    digest = hashlib.blake2b(password.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+    h1 = int.from_bytes(digest[:8], "little")
+    h2 = int.from_bytes(digest[8:], "little") | 1
+    return [(h1 + i * h2) % bits for i in range(hashes)]
+
+
+class BreachFilter:
+    def __init__(self, path=BREACH_FILE):
+        self.file = open(path, "rb")
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, self.bits, self.hashes = HEADER.unpack_from(self.map)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a breached-password filter")
+
+    def __contains__(self, password):
+        data = self.map
+        offset = HEADER.size
+        for position in bit_positions(password, self.bits, self.hashes):
+            if not data[offset + (position >> 3)] & (1 << (position & 7)):
+                return False
+        return True
+
+    def close(self):
+        self.map.close()
+        self.file.close()
+
+
+def open_filter(path=BREACH_FILE):
+    # None when no filter has been built yet, so the check is simply skipped
+    if not os.path.exists(path):
+        return None
+    return BreachFilter(path)
+
+
+def read_passwords(path):
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            password = line.rstrip("\r\n")
+            if password:
+                yield password
+
+
+def build_filter(source, target=BREACH_FILE, false_positive_rate=FALSE_POSITIVE_RATE):
+    count = sum(1 for _ in read_passwords(source))
+    bits = max(8, math.ceil(-count * math.log(false_positive_rate) / math.log(2) ** 2))
+    hashes = max(1, round(bits / max(count, 1) * math.log(2)))
+    data = bytearray((bits + 7) // 8)
+
+    for password in read_passwords(source):
+        for position in bit_positions(password, bits, hashes):
+            data[position >> 3] |= 1 << (position & 7)
+
+    with open(target, "wb") as f:
+        f.write(HEADER.pack(MAGIC, bits, hashes))
+        f.write(data)
+    return count, len(data), hashes
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] != "build":
+        print("Usage: python breach.py build <password list> [filter file] [false positive rate]")
+        return
+
+    source = sys.argv[2]
+    target = sys.argv[3] if len(sys.argv) > 3 else BREACH_FILE
+    rate = float(sys.argv[4]) if len(sys.argv) > 4 else FALSE_POSITIVE_RATE
+
+    start = time.perf_counter()
+    count, size, hashes = build_filter(source, target, rate)
+    print(f"Added {count} passwords to {target}: {size / 1024 / 1024:.1f} MB, "
+          f"{hashes} hashes, {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
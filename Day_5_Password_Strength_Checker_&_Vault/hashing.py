@@ -0,0 +1,196 @@
+import hashlib
+import hmac
+import json
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from vaultfile import fingerprint_salt, load_entries, save_entries
+
+CONFIG_FILE = "hashing.json"
+DEFAULT_ALGORITHM = "pbkdf2_sha256"
+DEFAULT_PARAMS = {
+    "pbkdf2_sha256": {"iterations": 310000},
+    "scrypt": {"n": 16384, "r": 8, "p": 1}
+}
+TARGET_MS = 250
+SALT_BYTES = 16
+
+
+# Every vault entry records how its hash was made:
+#   {"username": ..., "scheme": "scrypt", "params": {"n": 16384, "r": 8, "p": 1},
+#    "salt": "<hex>", "password_hash": "<hex>"}
+# Entries without "scheme" are the old unsalted sha256 hashes. Entries with
+# "prehash": "sha256" were re-hashed in bulk by audit.py, so their input is
+# the old sha256 hex digest instead of the password itself. The algorithm and
+# cost used for new hashes come from hashing.json, written by the benchmark.
+# Salted hashes of the same password differ, so entries of an encrypted vault
+# also keep a "fingerprint": the password's sha256 digest hashed with the
+# entry's own scheme and cost, but under one salt per vault (derived from the
+# vault's key, see vaultfile.py). Equal passwords in one vault get equal
+# fingerprints, which is what audit.py groups on to find reuse.
+# hashlib's pbkdf2_hmac and scrypt release the GIL, so a thread pool is
+# enough to verify many entries on all cores.
+
+def derive(algorithm, secret, salt, params):
+    if algorithm == "pbkdf2_sha256":
+        return hashlib.pbkdf2_hmac("sha256", secret, salt, params["iterations"])
+    if algorithm == "scrypt":
+        n, r, p = params["n"], params["r"], params["p"]
+        return hashlib.scrypt(secret, salt=salt, n=n, r=r, p=p, maxmem=256 * n * r * (p + 1), dklen=32)
+    raise ValueError(f"unknown hashing algorithm {algorithm!r}")
+
+
+def sha256_hex(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def load_config():
+    if os.path.exists(CONFIG_FILE):
+        with open(CONFIG_FILE, "r") as f:
+            config = json.load(f)
+        return config["algorithm"], config["params"]
+    return DEFAULT_ALGORITHM, DEFAULT_PARAMS[DEFAULT_ALGORITHM]
+
+
+def save_config(algorithm, params):
+    with open(CONFIG_FILE, "w") as f:
+        json.dump({"algorithm": algorithm, "params": params}, f, indent=4)
+
+
+def make_hash(secret, algorithm=None, params=None):
+    if algorithm is None:
+        algorithm, params = load_config()
+    elif params is None:
+        params = DEFAULT_PARAMS[algorithm]
+
+    salt = os.urandom(SALT_BYTES)
+    return {
+        "scheme": algorithm,
+        "params": dict(params),
+        "salt": salt.hex(),
+        "password_hash": derive(algorithm, secret, salt, params).hex()
+    }
+
+
+def fingerprint(sha256_digest, vault_salt, algorithm, params):
+    return derive(algorithm, sha256_digest.encode(), vault_salt, params).hex()
+
+
+def hash_password(password, algorithm=None, params=None, vault_salt=None):
+    # vault_salt is VaultFile.fingerprint_salt; None means no fingerprint
+    fields = make_hash(password.encode(), algorithm, params)
+    if vault_salt is not None:
+        fields["fingerprint"] = fingerprint(sha256_hex(password), vault_salt, fields["scheme"], fields["params"])
+    return fields
+
+
+def wrap_legacy(old_hash, algorithm=None, params=None, vault_salt=None):
+    # for bulk migration: the plaintext is unknown, so hash the sha256 digest
+    fields = dict(make_hash(old_hash.encode(), algorithm, params), prehash="sha256")
+    if vault_salt is not None:
+        fields["fingerprint"] = fingerprint(old_hash, vault_salt, fields["scheme"], fields["params"])
+    return fields
+
+
+def verify(entry, password):
+    if "scheme" not in entry:
+        return hmac.compare_digest(entry["password_hash"], sha256_hex(password))
+
+    secret = sha256_hex(password).encode() if entry.get("prehash") == "sha256" else password.encode()
+    expected = derive(entry["scheme"], secret, bytes.fromhex(entry["salt"]), entry["params"])
+    return hmac.compare_digest(expected.hex(), entry["password_hash"])
+
+
+def needs_rehash(entry, algorithm=None, params=None, vault_salt=None):
+    if algorithm is None:
+        algorithm, params = load_config()
+    return ("scheme" not in entry or "prehash" in entry
+            or (vault_salt is not None and "fingerprint" not in entry)
+            or entry["scheme"] != algorithm or entry["params"] != params)
+
+
+def verify_many(pairs, workers=None):
+    # pairs of (entry, password); results come back in the same order
+    with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+        return list(pool.map(lambda pair: verify(*pair), pairs))
+
+
+def time_hash(algorithm, params, rounds=3):
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        derive(algorithm, b"benchmark password", b"0123456789abcdef", params)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1000
+
+
+def tune(algorithm, target_ms=TARGET_MS):
+    # returns the cheapest params whose hash takes at least target_ms here
+    if algorithm == "pbkdf2_sha256":
+        iterations = 10000
+        elapsed = time_hash(algorithm, {"iterations": iterations})
+        iterations = max(10000, int(round(iterations * target_ms / elapsed, -3)))
+        return {"iterations": iterations}
+
+    if algorithm == "scrypt":
+        params = {"n": 1024, "r": 8, "p": 1}
+        while params["n"] < 2 ** 20 and time_hash(algorithm, params, rounds=1) < target_ms:
+            params["n"] *= 2
+        return params
+
+    raise ValueError(f"unknown hashing algorithm {algorithm!r}")
+
+
+def benchmark(target_ms, algorithm):
+    print(f"Tuning {algorithm} for {target_ms} ms per hash on this machine...")
+    params = tune(algorithm, target_ms)
+    print(f"  {params}: {time_hash(algorithm, params):.0f} ms per hash")
+    save_config(algorithm, params)
+    print(f"Saved to {CONFIG_FILE}; new and re-hashed entries will use it.")
+
+
+def verify_logins(vault_path, logins_path, workers=None):
+    # logins file has one "site,password" per line; every match that still
+    # uses an old scheme or cost is re-hashed with the current settings
+    vault = load_entries(vault_path)
+    with open(logins_path, "r", encoding="utf-8") as f:
+        logins = [line.rstrip("\r\n").split(",", 1) for line in f if "," in line]
+    logins = [(site, password) for site, password in logins if site in vault]
+
+    start = time.perf_counter()
+    results = verify_many([(vault[site], password) for site, password in logins], workers)
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f"{len(logins)} logins verified in {elapsed:.2f}s ({len(logins) / elapsed:.0f}/s): "
+          f"{sum(results)} matched, {len(results) - sum(results)} failed")
+
+    algorithm, params = load_config()
+    vault_salt = fingerprint_salt(vault_path)
+    stale = [(site, password) for (site, password), ok in zip(logins, results)
+             if ok and needs_rehash(vault[site], algorithm, params, vault_salt)]
+    with ThreadPoolExecutor(workers or os.cpu_count()) as pool:
+        fresh = pool.map(lambda login: hash_password(login[1], algorithm, params, vault_salt), stale)
+        for (site, _), fields in zip(stale, fresh):
+            vault[site].pop("prehash", None)
+            vault[site].update(fields)
+
+    save_entries(vault_path, vault, [site for site, _ in stale])
+    print(f"{len(stale)} entries re-hashed with {algorithm} {params}")
+
+
+def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == "benchmark":
+        target_ms = float(sys.argv[2]) if len(sys.argv) > 2 else TARGET_MS
+        algorithm = sys.argv[3] if len(sys.argv) > 3 else DEFAULT_ALGORITHM
+        benchmark(target_ms, algorithm)
+    elif len(sys.argv) >= 4 and sys.argv[1] == "verify":
+        verify_logins(sys.argv[2], sys.argv[3], int(sys.argv[4]) if len(sys.argv) > 4 else None)
+    else:
+        print("Usage: python hashing.py benchmark [target ms] [pbkdf2_sha256|scrypt]")
+        print("       python hashing.py verify <vault file> <site,password file> [threads]")
+
+
+if __name__ == "__main__":
+    main()
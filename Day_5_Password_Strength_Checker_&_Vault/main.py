@@ -1,70 +1,134 @@
-import json
 import os
-import hashlib
-import re
+import string
+import time
+from datetime import datetime
 from getpass import getpass
 
-DATA_FILE = "vault.json"
-
-
-def hash_password(password):
-    return hashlib.sha256(password.encode()).hexdigest()
+from audit import TIME_FORMAT, audit, rehash, run_in_pool
+from breach import open_filter
+from hashing import hash_password, needs_rehash, verify
+from vaultfile import DATA_FILE, LEGACY_FILE, VaultFile, migrate_json
+
+CHUNK_SIZE = 10000
+
+# character -> bit of the rule it satisfies (upper, lower, digit, symbol)
+CHAR_CLASSES = {}
+for chars, bit in ((string.ascii_uppercase, 1), (string.ascii_lowercase, 2),
+                   (string.digits, 4), ("!@#$%^&*()_+=-", 8)):
+    for char in chars:
+        CHAR_CLASSES[char] = bit
+ALL_CLASSES = 15
+CLASS_COUNT = [bin(mask).count("1") for mask in range(16)]
+STRENGTH_LABELS = ["Weak", "Weak", "Weak", "Medium", "Strong", "Very Strong"]
+
+
+def password_score(password):
+    # one pass over the characters, stopping once every class has been seen
+    found = 0
+    for char in password:
+        found |= CHAR_CLASSES.get(char, 0)
+        if found == ALL_CLASSES:
+            break
+    return CLASS_COUNT[found] + (len(password) >= 8)
 
 
 def password_strength(password):
-    score = 0
-    rules = [
-        len(password) >= 8,
-        re.search(r"[A-Z]", password),
-        re.search(r"[a-z]", password),
-        re.search(r"[0-9]", password),
-        re.search(r"[!@#$%^&*()_+=\-]", password)
-    ]
-    score = sum(bool(rule) for rule in rules)
-
-    if score <= 2:
-        return "Weak"
-    elif score == 3:
-        return "Medium"
-    elif score == 4:
-        return "Strong"
-    else:
-        return "Very Strong"
+    return STRENGTH_LABELS[password_score(password)]
 
 
-def load_vault():
-    if not os.path.exists(DATA_FILE):
-        return {}
+def strength_chunk(passwords):
+    return [password_strength(p) for p in passwords]
 
-    with open(DATA_FILE, "r") as f:
-        return json.load(f)
 
+def password_strength_many(passwords, workers=1, chunk_size=CHUNK_SIZE):
+    # yields (password, strength) in input order; with workers > 1 chunks are
+    # scored in a process pool, with only a few chunks in flight at a time
+    if workers <= 1:
+        for password in passwords:
+            yield password, password_strength(password)
+        return
+    yield from run_in_pool(strength_chunk, passwords, workers, chunk_size=chunk_size)
+
+
+def check_password_file(path, workers, breached=None):
+    counts = dict.fromkeys(STRENGTH_LABELS, 0)
+    checked = 0
+    found = 0
+    start = time.perf_counter()
+
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        passwords = (line.rstrip("\r\n") for line in f)
+        for password, strength in password_strength_many(passwords, workers):
+            counts[strength] += 1
+            if breached is not None and password in breached:
+                found += 1
+            checked += 1
+            if checked % 100000 == 0:
+                rate = checked / (time.perf_counter() - start)
+                print(f"\r{checked} checked ({rate:.0f} passwords/s)", end="", flush=True)
+
+    elapsed = max(time.perf_counter() - start, 1e-9)
+    print(f"\r{checked} passwords checked in {elapsed:.2f}s ({checked / elapsed:.0f} passwords/s)")
+    for label, count in counts.items():
+        print(f"  {label}: {count}")
+    if breached is not None:
+        print(f"  Found in breached-password list: {found}")
 
-def save_vault(vault):
-    with open(DATA_FILE, "w") as f:
-        json.dump(vault, f, indent=4)
+
+def load_vault():
+    vault = VaultFile(DATA_FILE)
+    if not vault and os.path.exists(LEGACY_FILE):
+        print(f"Moved {migrate_json(LEGACY_FILE, vault)} entries from {LEGACY_FILE} to {DATA_FILE}.")
+    return vault
 
 
-def add_entry(vault):
+def add_entry(vault, breached):
     site = input("Website: ")
     username = input("Username: ")
     password = getpass("Password: ")
 
     strength = password_strength(password)
-    print(f"Password strength: {strength}")
+    is_breached = breached is not None and password in breached
+    print(f"Password strength: {strength}" + (" (found in breached-password list!)" if is_breached else ""))
 
     if strength == "Weak":
         print("Password too weak. Entry not saved.")
         return
+    if is_breached:
+        print("Password is publicly known from a data breach. Entry not saved.")
+        return
 
-    vault[site] = {
+    entry = {
         "username": username,
-        "password_hash": hash_password(password)
+        "strength": strength,
+        "updated_at": datetime.now().strftime(TIME_FORMAT)
     }
-    save_vault(vault)
+    entry.update(hash_password(password, vault_salt=vault.fingerprint_salt))
+    vault[site] = entry  # appends one record to the vault file
     print("Entry saved securely.")
 
 
+def verify_entry(vault):
+    site = input("Website: ")
+    if site not in vault:
+        print("No entry for that website.")
+        return
+
+    password = getpass("Password: ")
+    entry = vault[site]
+    if not verify(entry, password):
+        print("Password does not match.")
+        return
+
+    print("Password matches.")
+    if needs_rehash(entry, vault_salt=vault.fingerprint_salt):
+        # the password is known now, so move the entry to the current scheme and cost
+        entry.pop("prehash", None)
+        entry.update(hash_password(password, vault_salt=vault.fingerprint_salt))
+        vault[site] = entry
+        print(f"Stored hash upgraded to {entry['scheme']}.")
+
+
 def view_entries(vault):
     if not vault:
         print("Vault is empty.")
@@ -78,21 +142,49 @@ def menu():
     print("\n=== PASSWORD VAULT ===")
     print("1. Add Entry")
     print("2. View Entries")
-    print("3. Exit")
+    print("3. Check Password File")
+    print("4. Audit Vault")
+    print("5. Verify Entry")
+    print("6. Exit")
 
 
 def main():
-    vault = load_vault()
+    try:
+        vault = load_vault()
+    except ValueError as e:
+        print(e)
+        return
+    breached = open_filter()  # None until "python breach.py build" has been run
 
     while True:
         menu()
         choice = input("Choose an option: ")
 
         if choice == "1":
-            add_entry(vault)
+            add_entry(vault, breached)
         elif choice == "2":
             view_entries(vault)
         elif choice == "3":
+            path = input("File with one password per line: ")
+            if not os.path.exists(path):
+                print("File not found.")
+                continue
+            workers = input(f"Worker processes [{os.cpu_count()}]: ")
+            check_password_file(path, int(workers) if workers else os.cpu_count(), breached)
+        elif choice == "4":
+            wordlist = input("Common password list (Enter to skip): ").strip()
+            if wordlist and not os.path.exists(wordlist):
+                print("File not found.")
+                continue
+            audit([DATA_FILE], wordlist or None)
+            if input("Re-hash old sha256 entries with the current scheme? (y/n): ").lower() == "y":
+                vault.close()
+                rehash([DATA_FILE])
+                vault = load_vault()
+        elif choice == "5":
+            verify_entry(vault)
+        elif choice == "6":
+            vault.close()
             print("Goodbye.")
             break
         else:
@@ -0,0 +1,302 @@
+import hashlib
+import hmac
+import json
+import os
+import struct
+import sys
+from collections.abc import MutableMapping
+
+try:
+    from cryptography.hazmat.primitives.ciphers.aead import AESGCM
+except ImportError:
+    AESGCM = None
+
+DATA_FILE = "vault.dat"
+LEGACY_FILE = "vault.json"
+COMPACT_BYTES = 64 * 1024  # never compact files smaller than this
+MAGIC = b"PWVAULT1"
+ENCRYPTED = 1
+FILE_HEADER = struct.Struct("<8sB")  # magic, flags
+RECORD = struct.Struct("<BHI")  # op, site length, body length
+TAG_SIZE = 32
+NONCE_SIZE = 12
+PUT, DELETE = 1, 2
+
+
+# The vault is an append-only file of records:
+#   op | site length | body length | site | body | HMAC-SHA256 tag
+# The body is the entry as JSON, encrypted with AES-GCM when the optional
+# "cryptography" package is installed. The tag covers the whole record, so a
+# changed or truncated record is detected when it is read. Opening the vault
+# only reads the small record headers and site names to build
+# site -> (offset, length); bodies are read when an entry is looked up.
+# Saving one site appends one record; when more than half of the file is
+# replaced or deleted records it is rewritten with only the live ones.
+# The key lives in a separate <name>.key file readable only by its owner.
+# The password fingerprint of an entry (see hashing.py) is kept only in an
+# encrypted body; without AES-GCM it is dropped before the entry is written.
+
+def load_key(path):
+    key_path = os.path.splitext(path)[0] + ".key"
+    if os.path.exists(key_path):
+        with open(key_path, "rb") as f:
+            return f.read()
+
+    key = os.urandom(32)
+    fd = os.open(key_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, "wb") as f:
+        f.write(key)
+    return key
+
+
+class VaultFile(MutableMapping):
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+        key = load_key(path)
+        self.mac_key = hmac.new(key, b"vault mac", hashlib.sha256).digest()
+        self.cipher_key = hmac.new(key, b"vault cipher", hashlib.sha256).digest()
+        self.index = {}  # site -> (offset, length)
+        self.live_bytes = 0
+
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(FILE_HEADER.pack(MAGIC, ENCRYPTED if AESGCM else 0))
+        self.file = open(path, "r+b")
+        self.scan()
+        # one fingerprint salt per vault, from its own key
+        self.fingerprint_salt = None
+        if self.flags & ENCRYPTED:
+            self.fingerprint_salt = hmac.new(key, b"vault fingerprint", hashlib.sha256).digest()[:16]
+
+    def scan(self):
+        f = self.file
+        f.seek(0)
+        magic, self.flags = FILE_HEADER.unpack(f.read(FILE_HEADER.size))
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not a vault file")
+        if self.flags & ENCRYPTED and AESGCM is None:
+            raise RuntimeError(f"{self.path} is encrypted; install the 'cryptography' package to open it")
+
+        size = os.fstat(f.fileno()).st_size
+        offset = FILE_HEADER.size
+        previous = None  # (offset, length) of the last whole record
+        while offset + RECORD.size <= size:
+            op, site_len, body_len = RECORD.unpack(f.read(RECORD.size))
+            length = RECORD.size + site_len + body_len + TAG_SIZE
+            if offset + length > size:
+                break
+            site = f.read(site_len).decode()
+            f.seek(body_len + TAG_SIZE, os.SEEK_CUR)
+
+            old = self.index.pop(site, None)
+            if old:
+                self.live_bytes -= old[1]
+            if op == PUT:
+                self.index[site] = (offset, length)
+                self.live_bytes += length
+            previous = (offset, length)
+            offset += length
+
+        self.end = offset
+        self.torn_bytes = 0
+        if self.end < size:
+            # only a record cut short by a crash while appending is removed,
+            # and its bytes are kept in <name>.torn; any other damage is
+            # reported and the file is left as it is
+            f.seek(offset)
+            rest = f.read(size - offset)
+            if not self.is_torn_tail(previous, rest):
+                raise ValueError(f"{self.path} is damaged at byte {offset}; the file was not changed")
+            with open(self.path + ".torn", "ab") as out:
+                out.write(rest)
+            f.truncate(self.end)
+            self.torn_bytes = len(rest)
+
+    def record_ok(self, record):
+        tag = hmac.new(self.mac_key, record[:-TAG_SIZE], hashlib.sha256).digest()
+        return hmac.compare_digest(tag, record[-TAG_SIZE:])
+
+    def is_torn_tail(self, previous, rest):
+        # torn if the records read so far still line up (the last one's tag
+        # checks out) and no whole record with a good tag follows the cut one
+        if previous is not None:
+            self.file.seek(previous[0])
+            if not self.record_ok(self.file.read(previous[1])):
+                return False
+
+        for start in range(1, len(rest) - RECORD.size - TAG_SIZE + 1):
+            op, site_len, body_len = RECORD.unpack_from(rest, start)
+            end = start + RECORD.size + site_len + body_len + TAG_SIZE
+            if op in (PUT, DELETE) and end <= len(rest) and self.record_ok(rest[start:end]):
+                return False
+        return True
+
+    def encode(self, op, site, entry):
+        site_bytes = site.encode()
+        if entry is not None and not self.flags & ENCRYPTED:
+            entry = {name: value for name, value in entry.items() if name != "fingerprint"}
+        body = b"" if entry is None else json.dumps(entry).encode()
+        if body and self.flags & ENCRYPTED:
+            nonce = os.urandom(NONCE_SIZE)
+            body = nonce + AESGCM(self.cipher_key).encrypt(nonce, body, site_bytes)
+        record = RECORD.pack(op, len(site_bytes), len(body)) + site_bytes + body
+        return record + hmac.new(self.mac_key, record, hashlib.sha256).digest()
+
+    def append(self, records):
+        # records: [(op, site, record bytes), ...], written with one write call
+        self.file.seek(self.end)
+        self.file.write(b"".join(record for _, _, record in records))
+        self.file.flush()
+
+        for op, site, record in records:
+            old = self.index.pop(site, None)
+            if old:
+                self.live_bytes -= old[1]
+            if op == PUT:
+                self.index[site] = (self.end, len(record))
+                self.live_bytes += len(record)
+            self.end += len(record)
+
+        if self.end > COMPACT_BYTES and self.end > 2 * self.live_bytes:
+            self.compact()
+
+    def __getitem__(self, site):
+        offset, length = self.index[site]
+        self.file.seek(offset)
+        record = self.file.read(length)
+        if not self.record_ok(record):
+            raise ValueError(f"vault record for {site!r} failed its integrity check")
+
+        site_bytes = site.encode()
+        body = record[RECORD.size + len(site_bytes):-TAG_SIZE]
+        if self.flags & ENCRYPTED:
+            body = AESGCM(self.cipher_key).decrypt(body[:NONCE_SIZE], body[NONCE_SIZE:], site_bytes)
+        return json.loads(body)
+
+    def __setitem__(self, site, entry):
+        self.append([(PUT, site, self.encode(PUT, site, entry))])
+
+    def __delitem__(self, site):
+        if site not in self.index:
+            raise KeyError(site)
+        self.append([(DELETE, site, self.encode(DELETE, site, None))])
+
+    def __iter__(self):
+        return iter(list(self.index))
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, site):
+        return site in self.index
+
+    def update_many(self, entries):
+        # one write for many sites, e.g. a migration or bulk re-hash
+        if entries:
+            self.append([(PUT, site, self.encode(PUT, site, entry)) for site, entry in entries.items()])
+
+    def compact(self):
+        temp_path = self.path + ".tmp"
+        index = {}
+        with open(temp_path, "wb") as out:
+            out.write(FILE_HEADER.pack(MAGIC, self.flags))
+            offset = FILE_HEADER.size
+            for site, (old_offset, length) in self.index.items():
+                self.file.seek(old_offset)
+                out.write(self.file.read(length))
+                index[site] = (offset, length)
+                offset += length
+            out.flush()
+            os.fsync(out.fileno())
+
+        self.file.close()
+        os.replace(temp_path, self.path)
+        self.file = open(self.path, "r+b")
+        self.index = index
+        self.end = offset
+        self.live_bytes = offset - FILE_HEADER.size
+
+    def close(self):
+        self.file.close()
+
+
+def migrate_json(json_path, vault):
+    with open(json_path, "r") as f:
+        entries = json.load(f)
+    vault.update_many(entries)
+    return len(entries)
+
+
+def load_entries(path):
+    # whole vault as a plain dict, from either the binary file or an old JSON one
+    if path.endswith(".json"):
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r") as f:
+            return json.load(f)
+
+    vault = VaultFile(path)
+    entries = dict(vault.items())
+    vault.close()
+    return entries
+
+
+def fingerprint_salt(path):
+    # None when fingerprints can't be stored in this vault (plain JSON or not encrypted)
+    if path.endswith(".json"):
+        return None
+    vault = VaultFile(path)
+    salt = vault.fingerprint_salt
+    vault.close()
+    return salt
+
+
+def save_entries(path, entries, sites=None):
+    # sites: only these changed, so only they are appended to a binary vault
+    if path.endswith(".json"):
+        plain = {site: {name: value for name, value in data.items() if name != "fingerprint"}
+                 for site, data in entries.items()}
+        with open(path, "w") as f:
+            json.dump(plain, f, indent=4)
+        return
+
+    vault = VaultFile(path)
+    vault.update_many({site: entries[site] for site in (entries if sites is None else sites)})
+    vault.close()
+
+
+def main():
+    if len(sys.argv) >= 2 and sys.argv[1] == "migrate":
+        source = sys.argv[2] if len(sys.argv) > 2 else LEGACY_FILE
+        target = sys.argv[3] if len(sys.argv) > 3 else DATA_FILE
+        vault = VaultFile(target)
+        print(f"Copied {migrate_json(source, vault)} entries from {source} to {target}.")
+        vault.close()
+    elif len(sys.argv) >= 2 and sys.argv[1] in ("check", "compact"):
+        try:
+            vault = VaultFile(sys.argv[2] if len(sys.argv) > 2 else DATA_FILE)
+        except ValueError as e:
+            print(e)
+            return
+        if sys.argv[1] == "compact":
+            vault.compact()
+        damaged = []
+        for site in vault:
+            try:
+                vault[site]
+            except ValueError:
+                damaged.append(site)
+        print(f"{len(vault) - len(damaged)} entries OK, {vault.end} bytes"
+              + (" (encrypted)" if vault.flags & ENCRYPTED else " (authenticated, not encrypted)"))
+        if vault.torn_bytes:
+            print(f"  removed a half-written last record ({vault.torn_bytes} bytes saved to {vault.path}.torn)")
+        for site in damaged:
+            print(f"  {site}: record was changed on disk")
+        vault.close()
+    else:
+        print("Usage: python vaultfile.py migrate [vault.json] [vault.dat]")
+        print("       python vaultfile.py check|compact [vault.dat]")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+import json
+import math
+import os
+import struct
+from array import array
+from datetime import datetime
+
+ANSWERS_FILE = "answers.jsonl"
+STATS_FILE = "question_stats.bin"
+SNAPSHOT_HEADER = struct.Struct("<QQ")  # answers log offset, number of questions
+START_ABILITY = 2.0
+ABILITY_STEP = 0.6
+
+
+# Every answer is appended to answers.jsonl:
+#   {"question": 12, "correct": true, "time": 4.2, "date": "..."}
+# and added to three arrays indexed by question number: times answered,
+# times correct and total seconds. The arrays are saved to question_stats.bin
+# together with how far into the log they go, so starting up only replays
+# the answers logged after the last save.
+
+class AnswerLog:
+    def __init__(self, log_path=ANSWERS_FILE, stats_path=STATS_FILE):
+        self.log_path = log_path
+        self.stats_path = stats_path
+        self.answered = array("I")
+        self.correct = array("I")
+        self.total_time = array("d")
+        self.log_offset = 0
+        self.writer = None
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.stats_path):
+            with open(self.stats_path, "rb") as f:
+                self.log_offset, count = SNAPSHOT_HEADER.unpack(f.read(SNAPSHOT_HEADER.size))
+                self.answered.fromfile(f, count)
+                self.correct.fromfile(f, count)
+                self.total_time.fromfile(f, count)
+
+        if not os.path.exists(self.log_path):
+            self.log_offset = 0
+            return
+
+        with open(self.log_path, "rb+") as f:
+            f.seek(self.log_offset)
+            for line in f:
+                try:
+                    event = json.loads(line)
+                except ValueError:
+                    f.truncate(self.log_offset)  # half-written last line from a crash
+                    break
+                self.apply(event)
+                self.log_offset += len(line)
+
+    def grow(self, number):
+        missing = number + 1 - len(self.answered)
+        if missing > 0:
+            self.answered.extend([0] * missing)
+            self.correct.extend([0] * missing)
+            self.total_time.extend([0.0] * missing)
+
+    def apply(self, event):
+        number = event["question"]
+        self.grow(number)
+        self.answered[number] += 1
+        self.correct[number] += event["correct"]
+        self.total_time[number] += event["time"]
+
+    def record(self, number, correct, seconds):
+        self.record_many([make_event(number, correct, seconds)])
+
+    def record_many(self, events):
+        # one write for a whole batch, e.g. from the exam server
+        if self.writer is None:
+            self.writer = open(self.log_path, "ab")
+        data = b"".join(json.dumps(event).encode() + b"\n" for event in events)
+        self.writer.write(data)
+        self.writer.flush()
+        self.log_offset += len(data)
+        for event in events:
+            self.apply(event)
+
+    def accuracy(self, number):
+        if number >= len(self.answered) or not self.answered[number]:
+            return None
+        return self.correct[number] / self.answered[number]
+
+    def average_time(self, number):
+        if number >= len(self.answered) or not self.answered[number]:
+            return None
+        return self.total_time[number] / self.answered[number]
+
+    def hardest(self, count=5, min_answers=3):
+        rated = [(self.correct[n] / self.answered[n], n)
+                 for n in range(len(self.answered)) if self.answered[n] >= min_answers]
+        return [n for _, n in sorted(rated)[:count]]
+
+    def save(self):
+        temp_path = self.stats_path + ".tmp"
+        with open(temp_path, "wb") as f:
+            f.write(SNAPSHOT_HEADER.pack(self.log_offset, len(self.answered)))
+            self.answered.tofile(f)
+            self.correct.tofile(f)
+            self.total_time.tofile(f)
+        os.replace(temp_path, self.stats_path)
+
+    def close(self):
+        self.save()
+        if self.writer is not None:
+            self.writer.close()
+
+
+def make_event(number, correct, seconds):
+    return {
+        "question": number,
+        "correct": correct,
+        "time": round(seconds, 2),
+        "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+
+
+def update_ability(ability, difficulty, correct):
+    # Elo-style: a right answer to a question harder than the current
+    # estimate moves it up a lot, an expected one only a little
+    expected = 1 / (1 + math.exp(difficulty - ability))
+    ability += ABILITY_STEP * ((1 if correct else 0) - expected)
+    return min(3.5, max(0.5, ability))
+
+
+def target_difficulty(ability):
+    return min(3, max(1, round(ability)))
@@ -0,0 +1,183 @@
+import json
+import os
+import random
+from array import array
+from bisect import bisect_right
+
+QUESTIONS_FILE = "questions.jsonl"
+INDEX_FILE = "questions.idx"
+TOPICS_FILE = "topics.json"
+DIFFICULTIES = {1: "easy", 2: "medium", 3: "hard"}
+DEFAULT_TOPIC = "general"
+DEFAULT_DIFFICULTY = 2
+
+
+# Question bodies are JSON lines in questions.jsonl. questions.idx holds two
+# unsigned 64-bit numbers per question: the byte offset of its line and its
+# key, topic id * 256 + difficulty. Opening the bank reads only the index (a
+# single read, even for a million questions); a body is read from disk when
+# the question is asked. Questions are grouped into (topic, difficulty)
+# buckets the first time a quiz needs them, and a quiz draws random
+# positions from the buckets it wants, so nothing is copied or filtered.
+
+class QuestionBank:
+    def __init__(self, folder="."):
+        self.questions_path = os.path.join(folder, QUESTIONS_FILE)
+        self.index_path = os.path.join(folder, INDEX_FILE)
+        self.topics_path = os.path.join(folder, TOPICS_FILE)
+
+        self.topics = []
+        if os.path.exists(self.topics_path):
+            with open(self.topics_path, "r") as f:
+                self.topics = json.load(f)
+        self.topic_ids = {name: i for i, name in enumerate(self.topics)}
+
+        raw = array("Q")
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "rb+") as f:
+                data = f.read()
+                whole = len(data) - len(data) % 16
+                if whole < len(data):
+                    f.truncate(whole)  # half-written record from a crash, cut before anything is appended
+            raw.frombytes(data[:whole])
+        self.offsets = raw[0::2]
+        self.keys = raw[1::2]
+
+        self.buckets = None  # key -> [question number, ...], built on first use
+        self.reader = None
+        self.writer = None
+
+    def __len__(self):
+        return len(self.offsets)
+
+    def __getitem__(self, number):
+        if self.reader is None:
+            self.reader = open(self.questions_path, "rb")
+        self.reader.seek(self.offsets[number])
+        return json.loads(self.reader.readline())
+
+    def topic_id(self, topic):
+        if topic not in self.topic_ids:
+            self.topic_ids[topic] = len(self.topics)
+            self.topics.append(topic)
+            with open(self.topics_path, "w") as f:
+                json.dump(self.topics, f, indent=4)
+        return self.topic_ids[topic]
+
+    def add(self, question):
+        self.commit(self.write_bodies([question]))
+        return len(self.keys) - 1
+
+    def write_bodies(self, questions):
+        # appends the question lines; they are not part of the bank until
+        # commit() adds their index records
+        if self.writer is None:
+            self.writer = open(self.questions_path, "ab")
+
+        records = array("Q")
+        offset = self.writer.tell()
+        lines = []
+        for question in questions:
+            question = dict(question)
+            question.setdefault("topic", DEFAULT_TOPIC)
+            question.setdefault("difficulty", DEFAULT_DIFFICULTY)
+            if question["difficulty"] not in DIFFICULTIES:
+                # the key packs difficulty into one byte, anything else would corrupt the topic
+                raise ValueError(f"unknown difficulty {question['difficulty']!r}")
+            line = json.dumps(question).encode() + b"\n"
+            records.extend([offset, self.topic_id(question["topic"]) * 256 + question["difficulty"]])
+            lines.append(line)
+            offset += len(line)
+
+        self.writer.write(b"".join(lines))
+        self.writer.flush()
+        return records
+
+    def commit(self, records):
+        # records: array of offset, key pairs from write_bodies(), written in one go
+        with open(self.index_path, "ab") as f:
+            records.tofile(f)
+
+        first = len(self.keys)
+        self.offsets.extend(records[0::2])
+        self.keys.extend(records[1::2])
+        if self.buckets is not None:
+            for number in range(first, len(self.keys)):
+                self.buckets.setdefault(self.keys[number], []).append(number)
+
+    def get_buckets(self):
+        if self.buckets is None:
+            self.buckets = {}
+            for number, key in enumerate(self.keys):
+                bucket = self.buckets.get(key)
+                if bucket is None:
+                    bucket = self.buckets[key] = []
+                bucket.append(number)
+        return self.buckets
+
+    def counts(self):
+        # {(topic, difficulty): number of questions}
+        return {(self.topics[key // 256], key % 256): len(bucket)
+                for key, bucket in self.get_buckets().items()}
+
+    def level_buckets(self, topics, level):
+        # the buckets of one difficulty for the given topics (all topics if none)
+        buckets = self.get_buckets()
+        topic_ids = range(len(self.topics)) if not topics else \
+            [self.topic_ids[topic] for topic in topics if topic in self.topic_ids]
+        return [buckets[t * 256 + level] for t in topic_ids if t * 256 + level in buckets]
+
+    def sample(self, count, topics=None, difficulty=None):
+        # question numbers; without a difficulty the levels are mixed as evenly as the bank allows
+        levels = [difficulty] if difficulty else list(DIFFICULTIES)
+        pools = {level: self.level_buckets(topics, level) for level in levels}
+        sizes = {level: sum(len(bucket) for bucket in pools[level]) for level in levels}
+
+        picked = []
+        for level, quota in balanced_quotas(count, sizes).items():
+            picked.extend(sample_buckets(pools[level], quota))
+        random.shuffle(picked)
+        return picked
+
+    def close(self):
+        for f in (self.reader, self.writer):
+            if f is not None:
+                f.close()
+
+
+def balanced_quotas(count, sizes):
+    quotas = dict.fromkeys(sizes, 0)
+    remaining = min(count, sum(sizes.values()))
+    open_levels = [level for level in sizes if sizes[level] > 0]
+
+    while remaining and open_levels:
+        share = max(1, remaining // len(open_levels))
+        for level in list(open_levels):
+            take = min(share, sizes[level] - quotas[level], remaining)
+            quotas[level] += take
+            remaining -= take
+            if quotas[level] == sizes[level]:
+                open_levels.remove(level)
+            if not remaining:
+                break
+    return quotas
+
+
+def sample_buckets(buckets, count):
+    # count distinct entries from several lists as if they were one, in O(count)
+    starts = []
+    total = 0
+    for bucket in buckets:
+        starts.append(total)
+        total += len(bucket)
+
+    picked = []
+    for position in random.sample(range(total), count):
+        i = bisect_right(starts, position) - 1
+        picked.append(buckets[i][position - starts[i]])
+    return picked
+
+
+def migrate_questions(questions, bank):
+    bank.commit(bank.write_bodies(questions))
+    return len(questions)
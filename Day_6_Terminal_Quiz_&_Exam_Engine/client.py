@@ -0,0 +1,65 @@
+import json
+import socket
+import sys
+
+from server import HOST, PORT
+
+
+# A candidate's terminal for server.py: asks the questions of one exam and
+# sends each answer to the exam server.
+
+class ExamConnection:
+    def __init__(self, host=HOST, port=PORT):
+        self.sock = socket.create_connection((host, port))
+        self.file = self.sock.makefile("rwb")
+
+    def request(self, **request):
+        self.file.write(json.dumps(request).encode() + b"\n")
+        self.file.flush()
+        return json.loads(self.file.readline())
+
+    def close(self):
+        self.file.close()
+        self.sock.close()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    try:
+        exam = ExamConnection(HOST, port)
+    except OSError:
+        print(f"Cannot reach the exam server on {HOST}:{port}. Is server.py running?")
+        return
+
+    name = input("Your name: ")
+    count = int(input("How many questions? "))
+    topics = [t.strip().lower() for t in input("Topics, comma separated (Enter for all): ").split(",") if t.strip()]
+    response = exam.request(cmd="start", name=name, count=count, topics=topics)
+    if not response["ok"]:
+        print(f"Cannot start: {response['error']}.")
+        exam.close()
+        return
+    print(f"{response['total']} questions, {response['time_limit']:.0f} seconds. Good luck!")
+
+    while True:
+        response = exam.request(cmd="next")
+        if response.get("done"):
+            break
+
+        print(f"\nQuestion {response['number']}: {response['question']} ({response['time_left']:.0f}s left)")
+        for idx, opt in enumerate(response["options"], 1):
+            print(f"{idx}. {opt}")
+
+        response = exam.request(cmd="answer", choice=int(input("Your answer: ")))
+        if response.get("done"):
+            break
+        print("Correct!" if response["correct"] else "Wrong!")
+
+    print("\nExam Finished!" if response["reason"] == "finished" else "\nTime is up!")
+    print(f"Score: {response['score']}/{response['total']}")
+    print(f"Time taken: {response['time']} seconds")
+    exam.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import json
+import os
+from bisect import bisect_left
+
+HISTORY_FILE = "history.jsonl"
+SUMMARY_FILE = "history_stats.json"
+
+
+# Quiz results are appended to history.jsonl, one attempt per line:
+#   {"date": "2026-03-01 18:22:05", "score": 7, "total": 10, "time": 81.5}
+# history_stats.json keeps the running numbers: count, mean and variance of
+# the score (Welford's method), best and worst attempt, and per day
+# [attempts, score sum, total sum, offset of the day's first line]. They are
+# updated on every append, so showing them never reads the log. Percentiles
+# and date-range reports stream the log from the first line of the start day.
+
+class QuizHistory:
+    def __init__(self, log_path=HISTORY_FILE, summary_path=SUMMARY_FILE):
+        self.log_path = log_path
+        self.summary_path = summary_path
+        self.summary = {"count": 0, "mean": 0.0, "m2": 0.0, "best": None, "worst": None, "days": {}, "offset": 0}
+        self.writer = None
+        self.load()
+
+    def load(self):
+        if os.path.exists(self.summary_path):
+            with open(self.summary_path, "r") as f:
+                self.summary = json.load(f)
+        if not os.path.exists(self.log_path):
+            return
+
+        # attempts logged after the summary was last saved
+        replayed = False
+        with open(self.log_path, "rb+") as f:
+            f.seek(self.summary["offset"])
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    f.truncate(self.summary["offset"])  # half-written last line from a crash
+                    break
+                self.apply(record, self.summary["offset"])
+                self.summary["offset"] += len(line)
+                replayed = True
+        if replayed:
+            self.save()
+
+    def apply(self, record, offset):
+        s = self.summary
+        s["count"] += 1
+        delta = record["score"] - s["mean"]
+        s["mean"] += delta / s["count"]
+        s["m2"] += delta * (record["score"] - s["mean"])
+
+        if s["best"] is None or record["score"] > s["best"]["score"]:
+            s["best"] = record
+        if s["worst"] is None or record["score"] < s["worst"]["score"]:
+            s["worst"] = record
+
+        day = s["days"].setdefault(record["date"][:10], [0, 0, 0, offset])
+        day[0] += 1
+        day[1] += record["score"]
+        day[2] += record["total"]
+
+    def add(self, record):
+        self.add_many([record])
+
+    def add_many(self, records):
+        if self.writer is None:
+            self.writer = open(self.log_path, "ab")
+        lines = [json.dumps(record).encode() + b"\n" for record in records]
+        self.writer.write(b"".join(lines))
+        self.writer.flush()
+
+        for record, line in zip(records, lines):
+            self.apply(record, self.summary["offset"])
+            self.summary["offset"] += len(line)
+        self.save()
+
+    def save(self):
+        temp_path = self.summary_path + ".tmp"
+        with open(temp_path, "w") as f:
+            json.dump(self.summary, f)
+        os.replace(temp_path, self.summary_path)
+
+    def count(self):
+        return self.summary["count"]
+
+    def mean(self):
+        return self.summary["mean"]
+
+    def stdev(self):
+        count = self.summary["count"]
+        return (self.summary["m2"] / (count - 1)) ** 0.5 if count > 1 else 0.0
+
+    def best(self):
+        return self.summary["best"]
+
+    def worst(self):
+        return self.summary["worst"]
+
+    def range_summary(self, start, end):
+        # (attempts, average score, average percent) for start <= day <= end, from the day buckets
+        attempts = score = total = 0
+        for day, bucket in self.summary["days"].items():
+            if start <= day <= end:
+                attempts += bucket[0]
+                score += bucket[1]
+                total += bucket[2]
+        if not attempts:
+            return 0, 0.0, 0.0
+        return attempts, score / attempts, 100 * score / total if total else 0.0
+
+    def stream(self, start=None, end=None):
+        days = sorted(self.summary["days"])
+        i = 0 if start is None else bisect_left(days, start)
+        if i == len(days) or not os.path.exists(self.log_path):
+            return
+
+        with open(self.log_path, "rb") as f:
+            f.seek(self.summary["days"][days[i]][3])
+            for line in f:
+                record = json.loads(line)
+                if end is not None and record["date"][:10] > end:
+                    break
+                yield record
+
+    def percentiles(self, points=(25, 50, 75, 90), start=None, end=None):
+        # percent scores counted in 101 buckets, so memory stays flat for any log size
+        counts = [0] * 101
+        attempts = 0
+        for record in self.stream(start, end):
+            if record["total"]:
+                counts[round(100 * record["score"] / record["total"])] += 1
+                attempts += 1
+        if not attempts:
+            return {}
+
+        result = {}
+        for point in points:
+            wanted = max(1, -(-attempts * point // 100))  # rank of the percentile, rounded up
+            seen = 0
+            for percent, count in enumerate(counts):
+                seen += count
+                if seen >= wanted:
+                    result[point] = percent
+                    break
+        return result
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
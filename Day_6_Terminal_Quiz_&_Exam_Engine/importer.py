@@ -0,0 +1,186 @@
+import csv
+import hashlib
+import json
+import sys
+import time
+from array import array
+from itertools import islice
+
+from bank import DIFFICULTIES, QuestionBank
+
+BATCH_SIZE = 10000
+CSV_FIELDS = ["question", "option1", "option2", "option3", "option4", "correct", "topic", "difficulty"]
+
+
+# Question files are streamed and checked in batches, so only one batch of
+# raw rows is in memory at a time. CSV files use the columns in CSV_FIELDS
+# with "correct" numbered 1-4 like in the menu; JSONL files hold one question
+# per line as stored in the bank ("options" list, "correct" counted from 0).
+# Duplicates, within the file or of questions already in the bank, are found
+# with a set of 8-byte hashes of the normalized question text. Each batch's
+# questions are appended to questions.jsonl as it is read, but the index is
+# written once at the end, so an interrupted import adds nothing to the bank.
+
+def read_rows(path):
+    with open(path, "r", newline="", encoding="utf-8") as f:
+        if path.lower().endswith((".jsonl", ".ndjson")):
+            for line in f:
+                if line.strip():
+                    try:
+                        yield json.loads(line)
+                    except ValueError:
+                        yield None  # counted as rejected by parse_batch
+        else:
+            yield from csv.DictReader(f)
+
+
+def batches(rows, size):
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def text_key(text):
+    normalized = " ".join(text.lower().split())
+    return hashlib.blake2b(normalized.encode(), digest_size=8).digest()
+
+
+def parse_row(row):
+    if "options" in row:
+        options = row["options"]
+        correct = int(row["correct"])
+    else:
+        options = [row[f"option{i}"] for i in range(1, 5)]
+        correct = int(row["correct"]) - 1
+
+    if not isinstance(options, list):
+        raise ValueError("options must be a list")
+    question = str(row["question"]).strip()
+    options = [str(option).strip() for option in options]
+    if not question:
+        raise ValueError("empty question")
+    if len(options) != 4 or not all(options):
+        raise ValueError("a question needs 4 non-empty options")
+    if not 0 <= correct < len(options):
+        raise ValueError(f"correct option {correct} out of range")
+
+    difficulty = int(row.get("difficulty") or 2)
+    if difficulty not in DIFFICULTIES:
+        raise ValueError(f"unknown difficulty {difficulty}")
+
+    return {
+        "question": question,
+        "options": options,
+        "correct": correct,
+        "topic": (row.get("topic") or "general").strip().lower(),
+        "difficulty": difficulty
+    }
+
+
+def parse_batch(batch, seen):
+    parsed = []
+    rejected = 0
+    duplicates = 0
+    for row in batch:
+        try:
+            question = parse_row(row)
+        except (KeyError, TypeError, ValueError, AttributeError):
+            rejected += 1
+            continue
+
+        key = text_key(question["question"])
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        parsed.append(question)
+    return parsed, rejected, duplicates
+
+
+def existing_keys(bank):
+    # one sequential read of questions.jsonl; lines left over from an
+    # interrupted import are not in the index and are skipped
+    keys = set()
+    if len(bank) == 0:
+        return keys
+
+    offsets = iter(bank.offsets)
+    wanted = next(offsets)
+    position = 0
+    with open(bank.questions_path, "rb") as f:
+        for line in f:
+            if position == wanted:
+                keys.add(text_key(json.loads(line)["question"]))
+                wanted = next(offsets, None)
+                if wanted is None:
+                    break
+            position += len(line)
+    return keys
+
+
+def import_file(bank, path, batch_size=BATCH_SIZE):
+    imported = rejected = duplicates = 0
+    start = time.perf_counter()
+    seen = existing_keys(bank)
+    records = array("Q")
+
+    for batch in batches(read_rows(path), batch_size):
+        parsed, bad, repeated = parse_batch(batch, seen)
+        records.extend(bank.write_bodies(parsed))
+        imported += len(parsed)
+        rejected += bad
+        duplicates += repeated
+
+        elapsed = max(time.perf_counter() - start, 1e-9)
+        print(f"\r{imported} questions imported ({imported / elapsed:.0f} questions/s)", end="", flush=True)
+
+    bank.commit(records)
+    elapsed = time.perf_counter() - start
+    print()
+    return imported, rejected, duplicates, elapsed
+
+
+def export_file(bank, path, topics=None):
+    exported = 0
+    start = time.perf_counter()
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        as_jsonl = path.lower().endswith((".jsonl", ".ndjson"))
+        writer = None if as_jsonl else csv.writer(f)
+        if writer:
+            writer.writerow(CSV_FIELDS)
+
+        for number in range(len(bank)):
+            q = bank[number]
+            if topics and q["topic"] not in topics:
+                continue
+            if as_jsonl:
+                f.write(json.dumps(q) + "\n")
+            else:
+                writer.writerow([q["question"], *q["options"], q["correct"] + 1, q["topic"], q["difficulty"]])
+            exported += 1
+
+    return exported, time.perf_counter() - start
+
+
+def main():
+    if len(sys.argv) < 3 or sys.argv[1] not in ("import", "export"):
+        print("Usage: python importer.py import <questions.csv|.jsonl>")
+        print("       python importer.py export <questions.csv|.jsonl> [topic,topic]")
+        return
+
+    bank = QuestionBank()
+    if sys.argv[1] == "import":
+        imported, rejected, duplicates, elapsed = import_file(bank, sys.argv[2])
+        print(f"{imported} imported, {rejected} rejected, {duplicates} duplicates skipped "
+              f"in {elapsed:.2f}s ({imported / max(elapsed, 1e-9):.0f} questions/s)")
+    else:
+        topics = sys.argv[3].lower().split(",") if len(sys.argv) > 3 else None
+        exported, elapsed = export_file(bank, sys.argv[2], topics)
+        print(f"{exported} questions exported in {elapsed:.2f}s ({exported / max(elapsed, 1e-9):.0f} questions/s)")
+    bank.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,123 @@
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+from answers import AnswerLog
+from bank import QuestionBank
+from history import QuizHistory
+from server import ExamServer, start_server
+
+# Usage: python loadtest.py [candidates] [questions per exam]
+# Starts an exam server on a throwaway bank of QUESTIONS questions, then
+# connects the given number of candidates at once. Each one starts an exam
+# and answers every question at random after a short think time. One extra
+# candidate sits on a question past a 1-second time limit to check that the
+# server ends the exam. Prints request latency percentiles at the end.
+
+QUESTIONS = 5000
+TOPICS = ["math", "science", "history", "geography"]
+THINK_TIME = 0.01
+
+
+def percentile(sorted_values, p):
+    return sorted_values[min(len(sorted_values) - 1, int(len(sorted_values) * p / 100))]
+
+
+async def connect(port):
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+
+    async def request(latencies, **payload):
+        start = time.perf_counter()
+        writer.write(json.dumps(payload).encode() + b"\n")
+        await writer.drain()
+        response = json.loads(await reader.readline())
+        latencies.append(time.perf_counter() - start)
+        return response
+
+    return request, writer
+
+
+async def candidate(port, number, count, start, latencies, scores):
+    request, writer = await connect(port)
+    await start.wait()
+
+    await request(latencies, cmd="start", name=f"candidate {number}", count=count,
+                  topics=random.sample(TOPICS, 2))
+    while True:
+        response = await request(latencies, cmd="next")
+        if response.get("done"):
+            break
+        await asyncio.sleep(random.uniform(0, THINK_TIME))
+        await request(latencies, cmd="answer", choice=random.randint(1, 4))
+    scores.append(response["score"])
+    writer.close()
+    await writer.wait_closed()
+
+
+async def slow_candidate(port):
+    request, writer = await connect(port)
+    await request([], cmd="start", name="slow", count=5, time_limit=1)
+    await request([], cmd="next")
+    await asyncio.sleep(1.2)
+    response = await request([], cmd="answer", choice=1)
+    writer.close()
+    await writer.wait_closed()
+    return response.get("reason")
+
+
+async def run(candidates, count):
+    with tempfile.TemporaryDirectory() as folder:
+        bank = QuestionBank(folder)
+        for i in range(QUESTIONS):
+            bank.add({"question": f"Question {i}?", "options": ["a", "b", "c", "d"], "correct": i % 4,
+                      "topic": TOPICS[i % len(TOPICS)], "difficulty": i % 3 + 1})
+
+        answers = AnswerLog(os.path.join(folder, "answers.jsonl"), os.path.join(folder, "question_stats.bin"))
+        history = QuizHistory(os.path.join(folder, "history.jsonl"), os.path.join(folder, "history_stats.json"))
+        server = ExamServer(bank, history, answers)
+        tcp_server, writer_task = await start_server(server, port=0)
+        port = tcp_server.sockets[0].getsockname()[1]
+
+        latencies = []
+        scores = []
+        start = asyncio.Event()
+        tasks = [asyncio.create_task(candidate(port, n, count, start, latencies, scores)) for n in range(candidates)]
+        slow = asyncio.create_task(slow_candidate(port))
+        await asyncio.sleep(0.2)  # let every candidate connect first
+
+        began = time.perf_counter()
+        start.set()
+        await asyncio.gather(*tasks)
+        elapsed = time.perf_counter() - began
+        print(f"Exam with a 1s limit answered after 1.2s ended with: {await slow!r} (expected 'time is up')")
+
+        await asyncio.sleep(0.1)  # let the server see every disconnect
+        writer_task.cancel()
+        tcp_server.close()
+        await tcp_server.wait_closed()
+        server.write_batch()
+
+        latencies.sort()
+        print(f"{candidates} candidates, {len(latencies)} requests in {elapsed:.2f}s "
+              f"({len(latencies) / elapsed:.0f} requests/s)")
+        print("Latency ms: " + ", ".join(f"p{p} {percentile(latencies, p) * 1000:.2f}" for p in (50, 90, 99))
+              + f", max {latencies[-1] * 1000:.2f}")
+        print(f"Results saved: {history.count()} (expected {candidates + 1}), "
+              f"answers logged: {sum(answers.answered)} (expected {candidates * count})")
+        answers.close()
+        history.close()
+        bank.close()
+
+
+def main():
+    candidates = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    asyncio.run(run(candidates, count))
+
+
+if __name__ == "__main__":
+    main()
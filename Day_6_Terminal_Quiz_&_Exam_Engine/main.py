@@ -4,27 +4,37 @@ import random
 import time
 from datetime import datetime
 
-DATA_FILE = "quiz_data.json"
+from answers import START_ABILITY, AnswerLog, target_difficulty, update_ability
+from bank import DIFFICULTIES, QuestionBank, migrate_questions
+from history import QuizHistory
+from importer import export_file, import_file
+
+DATA_FILE = "quiz_data.json"  # questions and history before they got their own files
+PAGE_SIZE = 20
+ADAPTIVE_DRAWS = 20  # random tries per level before scanning it
 
 
 # ----------------- DATA MANAGEMENT -----------------
 
-def load_data():
+def migrate_old_data(bank, history):
     if not os.path.exists(DATA_FILE):
-        return {"questions": [], "history": []}
+        return
 
     with open(DATA_FILE, "r") as f:
-        return json.load(f)
-
+        data = json.load(f)
 
-def save_data(data):
-    with open(DATA_FILE, "w") as f:
-        json.dump(data, f, indent=4)
+    if data.get("questions") and len(bank) == 0:
+        moved = migrate_questions(data["questions"], bank)
+        print(f"Moved {moved} questions to the question bank.")
+    if data.get("history") and history.count() == 0:
+        history.add_many(data["history"])
+        print(f"Moved {len(data['history'])} quiz results to the history log.")
+    os.replace(DATA_FILE, DATA_FILE + ".old")
 
 
 # ----------------- QUESTION MANAGEMENT -----------------
 
-def add_question(data):
+def add_question(bank):
     question = input("Enter question: ")
     options = []
 
@@ -33,87 +43,161 @@ def add_question(data):
         options.append(opt)
 
     correct = int(input("Correct option number (1-4): ")) - 1
+    topic = input("Topic: ").strip().lower() or "general"
+    difficulty = int(input("Difficulty (1 easy, 2 medium, 3 hard): ") or 2)
+    if difficulty not in DIFFICULTIES:
+        print("Difficulty must be 1, 2 or 3. Question not added.")
+        return
 
-    data["questions"].append({
+    bank.add({
         "question": question,
         "options": options,
-        "correct": correct
+        "correct": correct,
+        "topic": topic,
+        "difficulty": difficulty
     })
-
-    save_data(data)
     print("Question added successfully.")
 
 
-def show_questions(data):
-    if not data["questions"]:
+def show_questions(bank):
+    if len(bank) == 0:
         print("No questions available.")
         return
 
-    for i, q in enumerate(data["questions"], 1):
-        print(f"{i}. {q['question']}")
+    print(f"{len(bank)} questions:")
+    for (topic, difficulty), count in sorted(bank.counts().items()):
+        print(f"  {topic} ({DIFFICULTIES.get(difficulty, difficulty)}): {count}")
+
+    for i in range(len(bank)):
+        q = bank[i]
+        print(f"{i + 1}. [{q['topic']}] {q['question']}")
+        if (i + 1) % PAGE_SIZE == 0 and i + 1 < len(bank):
+            if input("-- Enter for more, q to stop: ").strip().lower() == "q":
+                return
 
 
 # ----------------- QUIZ ENGINE -----------------
 
-def start_quiz(data):
-    if not data["questions"]:
+def ask_question(bank, answers, number, i):
+    q = bank[number]
+    print(f"\nQuestion {i}: {q['question']}")
+    for idx, opt in enumerate(q["options"], 1):
+        print(f"{idx}. {opt}")
+
+    asked_at = time.time()
+    answer = int(input("Your answer: ")) - 1
+    correct = answer == q["correct"]
+    answers.record(number, correct, time.time() - asked_at)
+
+    print("Correct!" if correct else "Wrong!")
+    return q, correct
+
+
+def next_adaptive_question(bank, topics, ability, asked):
+    # closest difficulty to the ability estimate that still has unasked questions;
+    # a few random draws are enough while most of a level is unasked, and once
+    # they keep hitting asked questions the level's buckets are scanned instead
+    target = target_difficulty(ability)
+    for level in sorted(DIFFICULTIES, key=lambda d: abs(d - target)):
+        for _ in range(ADAPTIVE_DRAWS):
+            picked = bank.sample(1, topics, level)
+            if not picked:
+                break
+            if picked[0] not in asked:
+                return picked[0]
+        else:
+            unasked = [number for bucket in bank.level_buckets(topics, level)
+                       for number in bucket if number not in asked]
+            if unasked:
+                return random.choice(unasked)
+    return None
+
+
+def start_quiz(bank, history, answers):
+    if len(bank) == 0:
         print("No questions available.")
         return
 
     num = int(input("How many questions? "))
-    selected = random.sample(data["questions"], min(num, len(data["questions"])))
+    topics = [t.strip().lower() for t in input("Topics, comma separated (Enter for all): ").split(",") if t.strip()]
+    adaptive = input("Adaptive mode, harder or easier as you go? (y/n): ").lower() == "y"
+
+    numbers = []
+    if not adaptive:
+        difficulty = input("Difficulty (1 easy, 2 medium, 3 hard, Enter for a balanced mix): ")
+        numbers = bank.sample(num, topics, int(difficulty) if difficulty else None)
+        if not numbers:
+            print("No questions match.")
+            return
 
     score = 0
+    asked = set()
+    ability = START_ABILITY
     start_time = time.time()
 
-    for i, q in enumerate(selected, 1):
-        print(f"\nQuestion {i}: {q['question']}")
-        for idx, opt in enumerate(q["options"], 1):
-            print(f"{idx}. {opt}")
-
-        answer = int(input("Your answer: ")) - 1
-
-        if answer == q["correct"]:
-            print("Correct!")
-            score += 1
+    for i in range(1, num + 1):
+        if adaptive:
+            number = next_adaptive_question(bank, topics, ability, asked)
         else:
-            print("Wrong!")
+            number = numbers[i - 1] if i <= len(numbers) else None
+        if number is None:
+            break
+
+        asked.add(number)
+        q, correct = ask_question(bank, answers, number, i)
+        score += correct
+        if adaptive:
+            ability = update_ability(ability, q["difficulty"], correct)
 
     end_time = time.time()
     duration = round(end_time - start_time, 2)
+    answers.save()
 
     print("\nQuiz Finished!")
-    print(f"Score: {score}/{len(selected)}")
+    print(f"Score: {score}/{len(asked)}")
+    if adaptive:
+        print(f"Estimated level: {ability:.1f} (1 easy - 3 hard)")
     print(f"Time taken: {duration} seconds")
 
-    data["history"].append({
+    history.add({
         "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
         "score": score,
-        "total": len(selected),
+        "total": len(asked),
         "time": duration
     })
 
-    save_data(data)
-
 
 # ----------------- STATISTICS -----------------
 
-def show_statistics(data):
-    if not data["history"]:
+def show_statistics(history, bank, answers):
+    if history.count() == 0:
         print("No quiz history available.")
         return
 
-    total_attempts = len(data["history"])
-    avg_score = sum(h["score"] for h in data["history"]) / total_attempts
-
-    best = max(data["history"], key=lambda x: x["score"])
-    worst = min(data["history"], key=lambda x: x["score"])
+    best = history.best()
+    worst = history.worst()
 
-    print(f"\nTotal Attempts: {total_attempts}")
-    print(f"Average Score: {avg_score:.2f}")
+    print(f"\nTotal Attempts: {history.count()}")
+    print(f"Average Score: {history.mean():.2f} (std dev {history.stdev():.2f})")
     print(f"Best Score: {best['score']}/{best['total']}")
     print(f"Worst Score: {worst['score']}/{worst['total']}")
 
+    hardest = answers.hardest()
+    if hardest:
+        print("\nHardest questions:")
+        for number in hardest:
+            print(f"  {bank[number]['question']} - {answers.accuracy(number):.0%} correct, "
+                  f"{answers.average_time(number):.1f}s on average")
+
+    start = input("\nReport from date (YYYY-MM-DD, Enter to skip): ").strip()
+    if start:
+        end = input("Until date (YYYY-MM-DD, Enter for today): ").strip() or datetime.now().strftime("%Y-%m-%d")
+        attempts, avg, percent = history.range_summary(start, end)
+        print(f"{start} to {end}: {attempts} attempts, average score {avg:.2f} ({percent:.0f}%)")
+        if attempts:
+            points = history.percentiles(start=start, end=end)
+            print("Score percentiles: " + ", ".join(f"p{p} {value}%" for p, value in points.items()))
+
 
 # ----------------- MENU -----------------
 
@@ -123,25 +207,45 @@ def menu():
     print("2. Show Questions")
     print("3. Start Quiz")
     print("4. View Statistics")
-    print("5. Exit")
+    print("5. Import Questions")
+    print("6. Export Questions")
+    print("7. Exit")
 
 
 def main():
-    data = load_data()
+    bank = QuestionBank()
+    history = QuizHistory()
+    migrate_old_data(bank, history)
+    answers = AnswerLog()
 
     while True:
         menu()
         choice = input("Choose an option: ")
 
         if choice == "1":
-            add_question(data)
+            add_question(bank)
         elif choice == "2":
-            show_questions(data)
+            show_questions(bank)
         elif choice == "3":
-            start_quiz(data)
+            start_quiz(bank, history, answers)
         elif choice == "4":
-            show_statistics(data)
+            show_statistics(history, bank, answers)
         elif choice == "5":
+            path = input("CSV or JSONL file to import: ").strip()
+            if not os.path.exists(path):
+                print("File not found.")
+                continue
+            imported, rejected, duplicates, elapsed = import_file(bank, path)
+            print(f"{imported} questions imported in {elapsed:.2f}s, {rejected} rejected, {duplicates} duplicates skipped.")
+        elif choice == "6":
+            path = input("File to export to (.csv or .jsonl): ").strip()
+            topics = [t.strip().lower() for t in input("Topics, comma separated (Enter for all): ").split(",") if t.strip()]
+            exported, elapsed = export_file(bank, path, topics)
+            print(f"{exported} questions exported in {elapsed:.2f}s.")
+        elif choice == "7":
+            bank.close()
+            answers.close()
+            history.close()
             print("Goodbye!")
             break
         else:
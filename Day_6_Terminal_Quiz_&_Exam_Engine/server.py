@@ -0,0 +1,210 @@
+import asyncio
+import json
+import sys
+import time
+from datetime import datetime
+
+from answers import AnswerLog, make_event
+from bank import QuestionBank
+from history import QuizHistory
+from main import migrate_old_data
+
+HOST = "127.0.0.1"
+PORT = 8766
+TIME_LIMIT = 600  # seconds per exam unless the candidate asks for less
+FLUSH_INTERVAL = 0.5  # seconds between batched writes
+
+
+# Many candidates take exams at once, one TCP connection each, one JSON
+# object per line:
+#   {"cmd": "start", "name": "ann", "count": 10, "topics": ["math"], "time_limit": 300}
+#   {"cmd": "next"}            -> {"ok": true, "number": 1, "question": ..., "options": [...]}
+#   {"cmd": "answer", "choice": 2} -> {"ok": true, "correct": false}
+#   {"cmd": "finish"}          -> {"ok": true, "score": 7, "total": 10, "time": 81.5}
+# The question bank is shared and only read. Each exam has a deadline; after
+# it every request gets the final result, and an exam nobody touches is
+# closed by a timer. Answers and results are not written by the request that
+# produced them: they go on a queue that a single writer task empties in
+# batches every FLUSH_INTERVAL seconds.
+
+class Exam:
+    def __init__(self, name, numbers, time_limit):
+        self.name = name
+        self.numbers = numbers
+        self.position = 0  # questions handed out so far
+        self.score = 0
+        self.answered = 0
+        self.current = None  # (question number, question) waiting for an answer
+        self.asked_at = None
+        self.started = time.monotonic()
+        self.deadline = self.started + time_limit
+        self.timer = None
+        self.result = None
+
+
+class ExamServer:
+    def __init__(self, bank, history, answers):
+        self.bank = bank
+        self.history = history
+        self.answers = answers
+        self.queue = asyncio.Queue()
+        self.exams_running = 0
+
+    def handle(self, conn, request):
+        cmd = request.get("cmd")
+        if cmd == "start":
+            return self.start(conn, request)
+
+        exam = conn.get("exam")
+        if exam is None:
+            return {"ok": False, "error": "no exam started"}
+        if exam.result is None and time.monotonic() > exam.deadline:
+            self.finish(exam, "time is up")
+        if exam.result is not None:
+            return dict(exam.result, ok=True, done=True)
+
+        if cmd == "next":
+            return self.next_question(exam)
+        if cmd == "answer":
+            return self.answer(exam, int(request["choice"]) - 1)
+        if cmd == "finish":
+            return dict(self.finish(exam, "finished"), ok=True, done=True)
+        return {"ok": False, "error": f"unknown command {cmd!r}"}
+
+    def start(self, conn, request):
+        if conn.get("exam") is not None and conn["exam"].result is None:
+            return {"ok": False, "error": "exam already running"}
+
+        numbers = self.bank.sample(int(request.get("count", 10)), request.get("topics"), request.get("difficulty"))
+        if not numbers:
+            return {"ok": False, "error": "no questions match"}
+
+        time_limit = min(float(request.get("time_limit", TIME_LIMIT)), TIME_LIMIT)
+        exam = Exam(request.get("name", "anonymous"), numbers, time_limit)
+        exam.timer = asyncio.get_running_loop().call_later(time_limit, self.finish, exam, "time is up")
+        conn["exam"] = exam
+        self.exams_running += 1
+        return {"ok": True, "total": len(numbers), "time_limit": time_limit}
+
+    def next_question(self, exam):
+        if exam.current is None:
+            if exam.position == len(exam.numbers):
+                return dict(self.finish(exam, "finished"), ok=True, done=True)
+            number = exam.numbers[exam.position]
+            exam.position += 1
+            exam.current = (number, self.bank[number])
+            exam.asked_at = time.monotonic()
+
+        q = exam.current[1]
+        return {
+            "ok": True,
+            "number": exam.position,
+            "question": q["question"],
+            "options": q["options"],
+            "time_left": round(exam.deadline - time.monotonic(), 1)
+        }
+
+    def answer(self, exam, choice):
+        if exam.current is None:
+            return {"ok": False, "error": "ask for the next question first"}
+
+        number, q = exam.current
+        correct = choice == q["correct"]
+        self.queue.put_nowait(("answer", make_event(number, correct, time.monotonic() - exam.asked_at)))
+        exam.current = None
+        exam.answered += 1
+        exam.score += correct
+        return {"ok": True, "correct": correct}
+
+    def finish(self, exam, reason):
+        if exam.result is not None:
+            return exam.result
+
+        if exam.timer is not None:
+            exam.timer.cancel()
+        duration = round(min(time.monotonic(), exam.deadline) - exam.started, 2)
+        exam.result = {"score": exam.score, "total": len(exam.numbers), "time": duration, "reason": reason}
+        self.queue.put_nowait(("history", {
+            "date": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            "name": exam.name,
+            "score": exam.score,
+            "total": len(exam.numbers),
+            "time": duration
+        }))
+        self.exams_running -= 1
+        return exam.result
+
+    def write_batch(self):
+        history = []
+        events = []
+        while not self.queue.empty():
+            kind, item = self.queue.get_nowait()
+            (history if kind == "history" else events).append(item)
+
+        if events:
+            self.answers.record_many(events)
+        if history:
+            self.history.add_many(history)
+        return len(history), len(events)
+
+
+async def serve_client(server, reader, writer):
+    conn = {"exam": None}
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            try:
+                response = server.handle(conn, json.loads(line))
+            except (ValueError, KeyError, TypeError) as e:
+                response = {"ok": False, "error": str(e)}
+            writer.write(json.dumps(response).encode() + b"\n")
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        if conn["exam"] is not None:
+            server.finish(conn["exam"], "disconnected")
+        writer.close()
+
+
+async def write_behind(server):
+    while True:
+        await asyncio.sleep(FLUSH_INTERVAL)
+        server.write_batch()
+
+
+async def start_server(server, host=HOST, port=PORT):
+    tcp_server = await asyncio.start_server(lambda r, w: serve_client(server, r, w), host, port)
+    writer_task = asyncio.create_task(write_behind(server))
+    return tcp_server, writer_task
+
+
+async def run(server, host, port):
+    tcp_server, writer_task = await start_server(server, host, port)
+    print(f"Exam server with {len(server.bank)} questions on {host}:{port} (Ctrl+C to stop)")
+    try:
+        async with tcp_server:
+            await tcp_server.serve_forever()
+    finally:
+        writer_task.cancel()
+        server.write_batch()
+        server.answers.close()
+        server.history.close()
+
+
+def main():
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else PORT
+    bank = QuestionBank()
+    history = QuizHistory()
+    migrate_old_data(bank, history)
+    server = ExamServer(bank, history, AnswerLog())
+    try:
+        asyncio.run(run(server, HOST, port))
+    except KeyboardInterrupt:
+        print("Server stopped.")
+
+
+if __name__ == "__main__":
+    main()